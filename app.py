@@ -1,42 +1,60 @@
-import streamlit as st
-from etl_manager import load_exceptions_data
-from view_retrasos import render_vista_retrasos
-from view_paradas import render_vista_paradas
-from view_retrasos import render_tabla_detalle
-
-
-st.set_page_config(layout="wide")
-
-# Global date picker for 'hoy'
-if 'fecha_hoy' not in st.session_state:
-    st.session_state['fecha_hoy'] = None
-st.session_state['fecha_hoy'] = st.date_input(
-    "Selecciona la fecha de 'hoy' para el cálculo de retrasos",
-    value=st.session_state['fecha_hoy'] or None,
-    key='fecha_hoy_input'
-)
-
-# Inicializar session_state
-if 'selected_partner' not in st.session_state:
-    st.session_state.selected_partner = None
-if 'selected_region' not in st.session_state:
-    st.session_state.selected_region = None
-if 'selected_reason' not in st.session_state:
-    st.session_state.selected_reason = None
-
-# Cargar datos
-df_exceptions = load_exceptions_data("datamart.sqlite")
-
-
-# Tabs
-tab1, tab2, tab3 = st.tabs(["Retrasos", "Paradas", "Detalle"])
-
-# Pass fecha_hoy in session_state to all views
-with tab1:
-    render_vista_retrasos(df_exceptions, st.session_state)
-
-with tab2:
-    render_vista_paradas(df_exceptions, st.session_state)
-
-with tab3:
-    render_tabla_detalle(df_exceptions, st.session_state)
+import pandas as pd
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
+from etl_manager import load_exceptions_data, load_summary_metrics
+from view_retrasos import render_vista_retrasos, render_tabla_detalle
+from view_paradas import render_vista_paradas
+
+# Copy-on-write: las vistas trabajan sobre slices del frame compartido
+# sin copias defensivas; pandas solo copia si alguien escribe. En pandas
+# 3.x es el comportamiento único y tocar la opción emite deprecación.
+if int(pd.__version__.split('.', 1)[0]) < 3:
+    pd.options.mode.copy_on_write = True
+
+
+st.set_page_config(layout="wide")
+
+# Global date picker for 'hoy'
+if 'fecha_hoy' not in st.session_state:
+    st.session_state['fecha_hoy'] = None
+st.session_state['fecha_hoy'] = st.date_input(
+    "Selecciona la fecha de 'hoy' para el cálculo de retrasos",
+    value=st.session_state['fecha_hoy'] or None,
+    key='fecha_hoy_input'
+)
+
+# Inicializar session_state
+if 'selected_partner' not in st.session_state:
+    st.session_state.selected_partner = None
+if 'selected_region' not in st.session_state:
+    st.session_state.selected_region = None
+if 'selected_reason' not in st.session_state:
+    st.session_state.selected_reason = None
+
+# Cargar datos. sqlite3 libera el GIL durante execute/fetch y cada loader usa
+# su propia conexión, así que las cargas independientes pueden solaparse; el
+# wall clock del arranque frío tiende a max(t_i) en vez de la suma.
+with ThreadPoolExecutor(max_workers=2) as ex:
+    f_exc = ex.submit(load_exceptions_data, "datamart.sqlite")
+    f_kpi = ex.submit(load_summary_metrics, "datamart.sqlite")
+df_exceptions = f_exc.result()
+# Precalienta el cache de load_summary_metrics (solo trabaja en el arranque
+# frío; en reruns ambos futures devuelven resultados cacheados al instante).
+f_kpi.result()
+
+
+# Tabs
+tab1, tab2, tab3 = st.tabs(["Retrasos", "Paradas", "Detalle"])
+
+# Pass fecha_hoy in session_state to all views.
+# Nota: st.tabs ejecuta el cuerpo de todas las pestañas en cada run (el
+# cambio de pestaña es solo del lado del cliente), así que diferir los
+# imports de las vistas al cuerpo del tab no ahorraría nada.
+with tab1:
+    render_vista_retrasos(df_exceptions, st.session_state)
+
+with tab2:
+    render_vista_paradas(df_exceptions, st.session_state)
+
+with tab3:
+    render_tabla_detalle(df_exceptions, st.session_state)
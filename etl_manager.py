@@ -1,136 +1,427 @@
-"""
-ETL Manager for SAP Projects Exception Dashboard
-- Connects to SQLite database (configurable path)
-- Provides data loading functions for Fact_Proyectos and related dimensions
-- Includes exception filtering and summary metrics
-- Error handling and Streamlit cache support
-"""
-
-import sqlite3
-import pandas as pd
-import streamlit as st
-import os
-import requests
-
-def download_db_from_gdrive(local_path: str):
-    """
-    Descarga el archivo de base de datos desde Google Drive si no existe localmente.
-    Args:
-        local_path (str): Ruta local donde guardar el archivo.
-    """
-    file_id = "1McjYOomGSm8Emtsld_eXsNDYBMPvmt0U"  # ID extraído del enlace de Google Drive
-    gdrive_url = f"https://drive.google.com/uc?export=download&id={file_id}"
-    if not os.path.exists(local_path):
-        print("Descargando base de datos desde Google Drive...")
-        response = requests.get(gdrive_url)
-        with open(local_path, "wb") as f:
-            f.write(response.content)
-        print("Descarga completada.")
-
-
-
-def get_connection(db_path: str):
-    """
-    Establece conexión con la base de datos SQLite, descargándola de Google Drive si es necesario.
-    Args:
-        db_path (str): Ruta local de la base de datos.
-    Returns:
-        sqlite3.Connection: Objeto de conexión SQLite.
-    Raises:
-        sqlite3.Error: Si la conexión falla.
-    """
-    download_db_from_gdrive(db_path)
-    try:
-        conn = sqlite3.connect(db_path)
-        return conn
-    except sqlite3.Error as e:
-        raise RuntimeError(f"Error connecting to database: {e}")
-
-
-@st.cache_data(show_spinner=False)
-def load_fact_proyectos(db_path: str) -> pd.DataFrame:
-    """
-    Load Fact_Proyectos joined with Dim_Proyecto and Dim_Tiempo.
-    Args:
-        db_path (str): Path to the SQLite database file.
-    Returns:
-        pd.DataFrame: DataFrame with joined project facts and dimensions.
-    """
-    query = '''
-        SELECT f.*, dp.ProjectName, dp.ProjectStatus, dt.ContractSigned, dt.PlannedGoLive,
-               dt.Año, dt.Mes, dt.Trimestre,
-               f.CriticalityLevel, f.StatusReason_Category, f.ProjectStatus_Flag,
-               f.ImpactoVenta
-        FROM Fact_Proyectos_LIMPIA f
-        LEFT JOIN Dim_Proyecto dp ON f.ProjectID = dp.ProjectID
-        LEFT JOIN Dim_Tiempo dt ON f.DateKey = dt.DateKey
-    '''
-    try:
-        with get_connection(db_path) as conn:
-            df = pd.read_sql_query(query, conn)
-        return df
-    except Exception as e:
-        raise RuntimeError(f"Error loading Fact_Proyectos: {e}")
-
-
-@st.cache_data(show_spinner=False)
-def load_exceptions_data(db_path: str) -> pd.DataFrame:
-    """
-    Load only projects with IndicadorRetraso=1 OR Estado='Pausado'.
-    Args:
-        db_path (str): Path to the SQLite database file.
-    Returns:
-        pd.DataFrame: DataFrame with exception projects.
-    """
-    query = '''
-        SELECT f.*,
-               dp.ProjectName, dp.ProjectStatus,
-               dt.ContractSigned, dt.PlannedGoLive,
-               dt.Año, dt.Mes, dt.Trimestre,
-               dc.CustomerRegion,
-               ds.SolutionArea,
-               di.ISS,
-               dpa.MainPartner,
-               f.CriticalityLevel, f.StatusReason_Category, f.ProjectStatus_Flag
-        FROM Fact_Proyectos_LIMPIA f
-        LEFT JOIN Dim_Proyecto dp ON f.ProjectID = dp.ProjectID
-        LEFT JOIN Dim_Tiempo dt ON f.DateKey = dt.DateKey
-        LEFT JOIN Dim_Cliente dc ON f.CustomerID = dc.CustomerID
-        LEFT JOIN Dim_Solucion ds ON f.SolutionID = ds.SolutionID
-        LEFT JOIN Dim_Industria di ON f.IndustryID = di.IndustryID
-        LEFT JOIN Dim_Partner dpa ON f.PartnerID = dpa.PartnerID
-        WHERE f.IndicadorRetraso = 1 OR dp.ProjectStatus = 'Pausado'
-    '''
-    try:
-        with get_connection(db_path) as conn:
-            df = pd.read_sql_query(query, conn)
-        return df
-    except Exception as e:
-        raise RuntimeError(f"Error loading exceptions data: {e}")
-
-
-@st.cache_data(show_spinner=False)
-def load_summary_metrics(db_path: str) -> dict:
-    """
-    Compute global KPIs: average delay days, % affected, sales at risk.
-    Args:
-        db_path (str): Path to the SQLite database file.
-    Returns:
-        dict: Dictionary with KPI metrics.
-    """
-    query = '''
-        SELECT 
-            AVG(f.DiasRetraso) AS avg_delay_days,
-            SUM(CASE WHEN f.IndicadorRetraso = 1 OR dp.ProjectStatus = 'Pausado' THEN 1 ELSE 0 END) * 1.0 / COUNT(*) AS pct_affected
-        FROM Fact_Proyectos f
-        LEFT JOIN Dim_Proyecto dp ON f.ProjectID = dp.ProjectID
-    '''
-    try:
-        with get_connection(db_path) as conn:
-            row = pd.read_sql_query(query, conn).iloc[0]
-        return {
-            'avg_delay_days': row['avg_delay_days'],
-            'pct_affected': row['pct_affected']
-        }
-    except Exception as e:
-        raise RuntimeError(f"Error loading summary metrics: {e}")
+"""
+ETL Manager for SAP Projects Exception Dashboard
+- Connects to SQLite database (configurable path)
+- Provides data loading functions for Fact_Proyectos and related dimensions
+- Includes exception filtering and summary metrics
+- Error handling and Streamlit cache support
+"""
+
+import sqlite3
+import pandas as pd
+import streamlit as st
+import os
+import requests
+
+try:
+    import adbc_driver_sqlite.dbapi as adbc_sqlite
+    _HAS_ADBC = True
+except ImportError:
+    _HAS_ADBC = False
+
+try:
+    import polars as pl
+    _HAS_POLARS = True
+except ImportError:
+    _HAS_POLARS = False
+
+try:
+    import apsw
+    _HAS_APSW = True
+except ImportError:
+    _HAS_APSW = False
+
+try:
+    import zstandard
+    _HAS_ZSTD = True
+except ImportError:
+    _HAS_ZSTD = False
+
+# Firma de un frame zstd (los cuatro primeros bytes del archivo).
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+def download_db_from_gdrive(local_path: str):
+    """
+    Descarga el archivo de base de datos desde Google Drive si no existe localmente.
+    La descarga es en streaming (chunks de 1MB) para no cargar el archivo completo
+    en memoria, y se escribe a un archivo temporal '.part' que se renombra solo si
+    la descarga termina bien, evitando dejar un archivo truncado.
+    Un marcador '.complete' registra que la descarga terminó entera; no es una
+    validación de contenido (la base se muta legítimamente después, al crear
+    índices y por checkpoints WAL, así que un hash no sería re-verificable).
+    Args:
+        local_path (str): Ruta local donde guardar el archivo.
+    """
+    file_id = "1McjYOomGSm8Emtsld_eXsNDYBMPvmt0U"  # ID extraído del enlace de Google Drive
+    gdrive_url = f"https://drive.google.com/uc?export=download&id={file_id}"
+    done_path = local_path + ".complete"
+    legacy_hash_path = local_path + ".sha256"
+    if os.path.exists(local_path):
+        if os.path.getsize(local_path) > 0:
+            # Base no vacía: o la descarga terminó bien (marcador presente)
+            # o el archivo fue colocado a mano / marcado por una versión
+            # previa. En ambos casos se adopta tal cual, creando el marcador
+            # si falta, en vez de borrar una base válida y re-descargarla.
+            if not os.path.exists(done_path):
+                open(done_path, "w").close()
+            if os.path.exists(legacy_hash_path):
+                os.remove(legacy_hash_path)
+            return
+        # Archivo vacío: quedó de una descarga fallida anterior (antes esto
+        # 'envenenaba' cada run hasta borrarlo a mano). Rebajar.
+        print("Base de datos local inválida o incompleta; re-descargando...")
+        os.remove(local_path)
+    print("Descargando base de datos desde Google Drive...")
+    temp_path = local_path + ".part"
+    try:
+        with requests.Session() as session:
+            response = session.get(gdrive_url, stream=True, timeout=60)
+            # Google Drive muestra una página HTML de confirmación para archivos
+            # grandes; si aparece el token, reintentar con confirm=<token>.
+            token = next(
+                (v for k, v in response.cookies.items() if k.startswith("download_warning")),
+                None
+            )
+            if token is not None:
+                response.close()
+                response = session.get(
+                    gdrive_url, params={"confirm": token}, stream=True, timeout=60
+                )
+            with response:
+                response.raise_for_status()
+                with open(temp_path, "wb") as f:
+                    # Si el asset remoto es un .sqlite.zst, descomprimir en
+                    # línea mientras se descarga (el blob comprimido nunca se
+                    # materializa): la transferencia de red baja según el
+                    # ratio de compresión y zstd descomprime a ~1 GB/s.
+                    writer = f
+                    first_chunk = True
+                    for chunk in response.iter_content(chunk_size=1 << 20):
+                        if first_chunk:
+                            first_chunk = False
+                            if _HAS_ZSTD and chunk.startswith(_ZSTD_MAGIC):
+                                writer = zstandard.ZstdDecompressor().stream_writer(
+                                    f, closefd=False
+                                )
+                        writer.write(chunk)
+                    if writer is not f:
+                        writer.close()
+        os.replace(temp_path, local_path)
+        # El marcador se escribe solo después del replace: su existencia
+        # implica que la base en disco proviene de una descarga completa.
+        open(done_path, "w").close()
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    print("Descarga completada.")
+
+
+
+def _ensure_indexes(db_path: str):
+    """
+    Crea índices sobre las claves de join/filtro de Fact_Proyectos_LIMPIA la
+    primera vez que se abre la base descargada. Sin índices, cada LEFT JOIN
+    obliga a un full scan; con ellos cada join es una búsqueda O(log n) y el
+    filtro de excepciones usa un índice parcial. Una tabla centinela
+    versionada ('_indexed_v2') garantiza que el trabajo se haga una sola vez
+    por archivo y que bases indexadas por una versión anterior se re-indexen.
+    Args:
+        db_path (str): Ruta local de la base de datos.
+    """
+    try:
+        with sqlite3.connect(db_path) as conn:
+            cur = conn.cursor()
+            cur.execute(
+                "SELECT name FROM sqlite_master WHERE type='table' AND name='_indexed_v2'"
+            )
+            if cur.fetchone() is not None:
+                return
+            cur.executescript("""
+                CREATE INDEX IF NOT EXISTS ix_fact_proj ON Fact_Proyectos_LIMPIA(ProjectID);
+                CREATE INDEX IF NOT EXISTS ix_fact_date ON Fact_Proyectos_LIMPIA(DateKey);
+                CREATE INDEX IF NOT EXISTS ix_fact_cust ON Fact_Proyectos_LIMPIA(CustomerID);
+                CREATE INDEX IF NOT EXISTS ix_fact_sol  ON Fact_Proyectos_LIMPIA(SolutionID);
+                CREATE INDEX IF NOT EXISTS ix_fact_ind  ON Fact_Proyectos_LIMPIA(IndustryID);
+                CREATE INDEX IF NOT EXISTS ix_fact_part ON Fact_Proyectos_LIMPIA(PartnerID);
+                CREATE INDEX IF NOT EXISTS ix_fact_exc  ON Fact_Proyectos_LIMPIA(ProjectID)
+                    WHERE IndicadorRetraso = 1;
+                CREATE INDEX IF NOT EXISTS ix_dimproy_status ON Dim_Proyecto(ProjectStatus);
+            """ + _MV_EXCEPTIONS + """
+                ANALYZE;
+                DROP TABLE IF EXISTS _indexed_v1;
+                CREATE TABLE _indexed_v2 (done INTEGER);
+            """)
+            conn.commit()
+    except sqlite3.Error as e:
+        # La indexación es una optimización: si falla (p.ej. disco de solo
+        # lectura), las consultas siguen funcionando con full scans.
+        print(f"No se pudieron crear índices: {e}")
+
+
+def get_connection(db_path: str):
+    """
+    Establece conexión con la base de datos SQLite, descargándola de Google Drive si es necesario.
+    Args:
+        db_path (str): Ruta local de la base de datos.
+    Returns:
+        sqlite3.Connection: Objeto de conexión SQLite.
+    Raises:
+        sqlite3.Error: Si la conexión falla.
+    """
+    download_db_from_gdrive(db_path)
+    _ensure_indexes(db_path)
+    try:
+        conn = sqlite3.connect(db_path)
+        # PRAGMAs de lectura: cache grande para mantener las dimensiones
+        # residentes entre los load_*, mmap para servir páginas calientes sin
+        # syscalls, y WAL+NORMAL que es seguro en esta carga de solo lectura.
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA cache_size=-262144")
+        conn.execute("PRAGMA mmap_size=1073741824")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA query_only=1")
+        return conn
+    except sqlite3.Error as e:
+        raise RuntimeError(f"Error connecting to database: {e}")
+
+
+# Consulta única sobre la que se derivan fact, excepciones y KPIs. Proyecta
+# solo las columnas que las vistas realmente consumen (en vez de f.*),
+# reduciendo las filas intermedias y los bytes que cruzan el cursor de sqlite3.
+_JOINED_SELECT = '''
+    SELECT f.ProjectID, f.SolutionID, f.IndustryID,
+           f.DiasRetraso, f.IndicadorRetraso, f.ImpactoVenta,
+           f.CriticalityLevel, f.StatusReason_Category, f.ProjectStatus_Flag,
+           dp.ProjectName, dp.ProjectStatus,
+           dt.ContractSigned, dt.PlannedGoLive,
+           dt.Año, dt.Mes, dt.Trimestre,
+           dc.CustomerRegion,
+           ds.SolutionArea,
+           di.ISS,
+           dpa.MainPartner
+    FROM Fact_Proyectos_LIMPIA f
+    LEFT JOIN Dim_Proyecto dp ON f.ProjectID = dp.ProjectID
+    LEFT JOIN Dim_Tiempo dt ON f.DateKey = dt.DateKey
+    LEFT JOIN Dim_Cliente dc ON f.CustomerID = dc.CustomerID
+    LEFT JOIN Dim_Solucion ds ON f.SolutionID = ds.SolutionID
+    LEFT JOIN Dim_Industria di ON f.IndustryID = di.IndustryID
+    LEFT JOIN Dim_Partner dpa ON f.PartnerID = dpa.PartnerID
+'''
+
+_FULL_QUERY = _JOINED_SELECT
+
+# Tabla materializada de excepciones: los seis joins se resuelven una sola vez
+# por archivo descargado. El OR del predicado se parte en dos ramas UNION ALL
+# disjuntas para que cada una sea sargable: la primera usa el índice parcial
+# ix_fact_exc y la segunda ix_dimproy_status. 'IS NOT 1' y no '<> 1' en la
+# segunda rama: con IndicadorRetraso NULL, '<> 1' no es verdadero en SQL y
+# excluiría proyectos pausados sin indicador, divergiendo de _exceptions_mask.
+_MV_EXCEPTIONS = f'''
+    DROP TABLE IF EXISTS MV_Fact_Exceptions;
+    CREATE TABLE MV_Fact_Exceptions AS
+    {_JOINED_SELECT}
+    WHERE f.IndicadorRetraso = 1
+    UNION ALL
+    {_JOINED_SELECT}
+    WHERE dp.ProjectStatus = 'Pausado' AND f.IndicadorRetraso IS NOT 1;
+    CREATE INDEX IF NOT EXISTS ix_mv_proj ON MV_Fact_Exceptions(ProjectID);
+'''
+
+
+@st.cache_resource(show_spinner=False)
+def _get_conn(db_path: str):
+    """
+    Conexión sqlite3 persistente y de solo lectura, compartida entre reruns.
+    Reutilizar la misma conexión evita re-preparar (parser + planner) el SQL
+    multi-join en cada rerun y mantiene caliente el page cache de SQLite.
+    check_same_thread=False porque Streamlit ejecuta callbacks en hilos
+    distintos; la conexión es read-only así que compartirla es segura.
+    Args:
+        db_path (str): Ruta local de la base de datos.
+    Returns:
+        sqlite3.Connection: Conexión de solo lectura reutilizable.
+    """
+    download_db_from_gdrive(db_path)
+    _ensure_indexes(db_path)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+    conn.execute("PRAGMA cache_size=-262144")
+    conn.execute("PRAGMA mmap_size=1073741824")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def _fetch_df(query: str, db_path: str) -> pd.DataFrame:
+    """
+    Ejecuta una consulta y devuelve un DataFrame usando el driver más rápido
+    disponible. Los loaders comparten este punto único para cambiar de
+    implementación de forma uniforme:
+    - ADBC: buffers Arrow desde la C API de SQLite, sin tuplas Python.
+    - Polars/connectorx: lectura columnar Arrow vía Rust.
+    - apsw: expone la C API cruda sin la capa de conversión por celda del
+      sqlite3 de la stdlib.
+    - sqlite3 + pandas: fallback siempre disponible.
+    Args:
+        query (str): Consulta SQL a ejecutar.
+        db_path (str): Ruta local de la base de datos.
+    Returns:
+        pd.DataFrame: Resultado de la consulta.
+    """
+    download_db_from_gdrive(db_path)
+    _ensure_indexes(db_path)
+    if _HAS_ADBC:
+        with adbc_sqlite.connect(db_path) as conn:
+            with conn.cursor() as cur:
+                cur.execute(query)
+                table = cur.fetch_arrow_table()
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    if _HAS_POLARS:
+        return pl.read_database_uri(
+            query, f"sqlite://{os.path.abspath(db_path)}", engine="connectorx"
+        ).to_pandas(use_pyarrow_extension_array=True)
+    if _HAS_APSW:
+        conn = apsw.Connection(db_path)
+        try:
+            cur = conn.cursor()
+            cur.execute(query)
+            columns = [d[0] for d in cur.getdescription()]
+            return pd.DataFrame.from_records(cur.fetchall(), columns=columns)
+        finally:
+            conn.close()
+    # Leer por bloques de 50k filas acota el pico de memoria: las tuplas
+    # Python de cada bloque se liberan apenas se materializan sus arrays,
+    # en vez de convivir con el DataFrame completo al final.
+    chunks = list(pd.read_sql_query(query, _get_conn(db_path), chunksize=50_000))
+    if not chunks:
+        return pd.read_sql_query(query, _get_conn(db_path))
+    return pd.concat(chunks, ignore_index=True)
+
+
+@st.cache_resource(show_spinner=False)
+def load_all(db_path: str) -> pd.DataFrame:
+    """
+    Load the full Fact_Proyectos_LIMPIA joined with all dimensions, once.
+    st.cache_resource devuelve el mismo objeto por referencia (sin pickling),
+    así los reruns de Streamlit no vuelven a tocar la base ni serializan el
+    DataFrame. Las excepciones y los KPIs se derivan de este frame en memoria.
+    Args:
+        db_path (str): Path to the SQLite database file.
+    Returns:
+        pd.DataFrame: DataFrame with joined project facts and dimensions.
+    """
+    try:
+        return _fetch_df(_FULL_QUERY, db_path)
+    except Exception as e:
+        raise RuntimeError(f"Error loading Fact_Proyectos: {e}")
+
+
+# Etiquetas para joins sin correspondencia, espejo de los defaults que las
+# vistas aplican en su preparación (así su fillna posterior es un no-op).
+_CAT_DEFAULTS = {
+    'CustomerRegion': 'No Especificado',
+    'SolutionArea': 'No Especificado',
+    'MainPartner': 'No Especificado',
+    'ISS': 'No Especificado',
+    'CriticalityLevel': 'Normal',
+    'StatusReason_Category': 'Otro',
+    'ProjectStatus': 'Unknown',
+    'ProjectStatus_Flag': 'Unknown',
+}
+
+
+def _exceptions_mask(df: pd.DataFrame) -> pd.Series:
+    """Máscara booleana de proyectos excepción (retrasados o pausados)."""
+    return (df['IndicadorRetraso'] == 1) | (df['ProjectStatus'] == 'Pausado')
+
+
+def load_fact_proyectos(db_path: str) -> pd.DataFrame:
+    """
+    Load Fact_Proyectos joined with Dim_Proyecto and Dim_Tiempo.
+    Args:
+        db_path (str): Path to the SQLite database file.
+    Returns:
+        pd.DataFrame: DataFrame with joined project facts and dimensions.
+    """
+    return load_all(db_path)
+
+
+@st.cache_resource(show_spinner=False)
+def load_exceptions_data(db_path: str) -> pd.DataFrame:
+    """
+    Load only projects with IndicadorRetraso=1 OR Estado='Pausado'.
+    Derivado del frame completo cacheado: una máscara booleana en memoria en
+    lugar de una segunda consulta SQL con los mismos joins. El resultado se
+    persiste como sidecar Parquet (columnar, strings dictionary-encoded) junto
+    a la base: en arranques fríos posteriores se lee ese archivo directamente
+    sin pasar por sqlite3, siempre que sea más nuevo que el .sqlite.
+    Args:
+        db_path (str): Path to the SQLite database file.
+    Returns:
+        pd.DataFrame: DataFrame with exception projects.
+    """
+    cache_path = db_path + ".exceptions.parquet"
+    if os.path.exists(cache_path) and os.path.exists(db_path):
+        if os.path.getmtime(cache_path) >= os.path.getmtime(db_path):
+            try:
+                return pd.read_parquet(cache_path, engine='pyarrow')
+            except Exception:
+                # Sidecar corrupto o de una versión incompatible: regenerarlo.
+                os.remove(cache_path)
+
+    try:
+        # Los joins ya están resueltos en la tabla materializada: un solo
+        # scan indexado en lugar de seis joins por carga.
+        df = _fetch_df("SELECT * FROM MV_Fact_Exceptions", db_path)
+    except Exception:
+        # Base indexada por una versión previa sin la tabla materializada.
+        df = load_all(db_path)
+        df = df[_exceptions_mask(df)].copy()
+    # Los LEFT JOIN dejan NaN en los atributos de dimensión cuando la fila
+    # de hechos no tiene correspondencia. Rellenar ANTES del cast con las
+    # mismas etiquetas por defecto que usan las vistas: fillna sobre una
+    # categórica lanza TypeError si la etiqueta no existe como categoría.
+    df = df.fillna({c: v for c, v in _CAT_DEFAULTS.items() if c in df.columns})
+    # Dictionary encoding: las columnas de baja cardinalidad se guardan como
+    # códigos enteros + tabla de valores únicos, tanto en memoria como en
+    # disco. Filtros y groupby sobre categóricas comparan enteros, y el hash
+    # del cache de Streamlit recorre el arreglo de códigos, no N strings.
+    cat_cols = ['CustomerRegion', 'SolutionArea', 'MainPartner', 'ISS',
+                'CriticalityLevel', 'StatusReason_Category', 'ProjectStatus',
+                'ProjectStatus_Flag', 'Año', 'Mes', 'Trimestre']
+    for c in cat_cols:
+        if c in df.columns:
+            df[c] = df[c].astype('category')
+    try:
+        df.to_parquet(cache_path, engine='pyarrow', compression='snappy')
+    except Exception as e:
+        # El sidecar es solo una optimización de arranque frío.
+        print(f"No se pudo escribir el sidecar Parquet: {e}")
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def _count_fact_rows(db_path: str) -> int:
+    """Total de filas de Fact_Proyectos_LIMPIA (denominador de los KPIs)."""
+    return int(_fetch_df(
+        "SELECT COUNT(*) AS c FROM Fact_Proyectos_LIMPIA", db_path
+    ).iat[0, 0])
+
+
+@st.cache_data(show_spinner=False)
+def load_summary_metrics(db_path: str) -> dict:
+    """
+    Compute global KPIs: average delay days, % affected.
+    Reusa el frame de excepciones ya cacheado (que en arranques fríos puede
+    venir del sidecar Parquet) más un COUNT(*) barato como denominador, en
+    lugar de cargar el join completo solo para dos reducciones. Cacheada a
+    su vez: el dict es diminuto y así la media no se recalcula por rerun.
+    Args:
+        db_path (str): Path to the SQLite database file.
+    Returns:
+        dict: Dictionary with KPI metrics.
+    """
+    df = load_exceptions_data(db_path)
+    total = _count_fact_rows(db_path)
+    return {
+        'avg_delay_days': float(df['DiasRetraso'].mean()),
+        'pct_affected': (len(df) / total) if total else 0.0
+    }
@@ -1,601 +1,771 @@
-"""
-Vista Paradas de Proyecto - Dashboard General Optimizado
-Diseño ejecutivo con visualizaciones estratégicas y análisis multidimensional
-"""
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from datetime import datetime
-
-
-def render_vista_paradas(df: pd.DataFrame, session_state: dict):
-    """
-    Dashboard ejecutivo de paradas con visualizaciones estratégicas.
-    """
-    st.title("Dashboard Ejecutivo - Paradas de Proyecto")
-    
-    df = df.copy()
-    
-    diagnostico = _diagnosticar_disponibilidad_datos(df)
-    
-    if diagnostico['faltan_criticas']:
-        st.warning(
-            f"Columnas críticas no disponibles: {', '.join(diagnostico['faltan_criticas'])}. "
-            f"El dashboard funcionará con datos parciales."
-        )
-    
-    with st.expander("Diagnóstico de Disponibilidad de Datos"):
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("**Columnas Disponibles**")
-            st.caption(f"Total: {len(diagnostico['disponibles'])}")
-            for col in sorted(diagnostico['disponibles'])[:20]:
-                st.text(f"  {col}")
-            if len(diagnostico['disponibles']) > 20:
-                st.caption(f"  ... y {len(diagnostico['disponibles']) - 20} más")
-        
-        with col2:
-            st.markdown("**Columnas Faltantes**")
-            st.caption(f"Total: {len(diagnostico['faltan_all'])}")
-            for col in sorted(diagnostico['faltan_all'])[:20]:
-                st.text(f"  {col}")
-            if len(diagnostico['faltan_all']) > 20:
-                st.caption(f"  ... y {len(diagnostico['faltan_all']) - 20} más")
-    
-    df = _preparar_datos_robustos(df)
-    
-    if df.empty:
-        st.error("No hay datos disponibles para procesar después de la validación.")
-        return
-    
-    _render_kpis_ejecutivos(df, session_state)
-    
-    st.divider()
-    
-    df_filtrado = _aplicar_filtros_avanzados(df)
-    
-    if df_filtrado.empty:
-        st.info("No hay datos que coincidan con los filtros seleccionados.")
-        return
-    
-    st.divider()
-    
-    _render_analisis_distribucion(df_filtrado)
-    
-    st.divider()
-    
-    _render_analisis_temporal(df_filtrado)
-    
-    st.divider()
-    
-    _render_matriz_impacto(df_filtrado)
-    
-    st.divider()
-    
-    _render_analisis_comparativo(df_filtrado)
-    
-    st.divider()
-    
-    _render_tablas_detalle(df_filtrado)
-
-
-def _diagnosticar_disponibilidad_datos(df: pd.DataFrame) -> dict:
-    """Diagnostica disponibilidad de columnas esperadas."""
-    
-    columnas_esperadas = {
-        'criticas': [
-            'ProjectID', 'ProjectName', 'CustomerRegion', 
-            'ProjectStatus_Flag', 'DiasRetraso'
-        ],
-        'temporales': ['Año', 'Trimestre', 'Mes', 'FechaActualizacion'],
-        'detalle': [
-            'CriticalityLevel', 'StatusReason_Category', 'IndicadorRetraso', 
-            'ImpactoVenta', 'DuracionProyecto', 'SolutionID', 'IndustryID'
-        ]
-    }
-    
-    disponibles = df.columns.tolist()
-    faltan_criticas = [c for c in columnas_esperadas['criticas'] if c not in disponibles]
-    faltan_all = []
-    for grupo in columnas_esperadas.values():
-        faltan_all.extend([c for c in grupo if c not in disponibles])
-    
-    return {
-        'disponibles': disponibles,
-        'faltan_criticas': faltan_criticas,
-        'faltan_all': list(set(faltan_all)),
-        'columnas_esperadas': columnas_esperadas
-    }
-
-
-def _preparar_datos_robustos(df: pd.DataFrame) -> pd.DataFrame:
-    """Prepara datos con validación inteligente y transformaciones."""
-    
-    df = df.copy()
-    
-    if df.columns.duplicated().any():
-        df = df.loc[:, ~df.columns.duplicated()]
-    
-    columnas_criticas = {
-        'ProjectID': range(1, len(df) + 1),
-        'ProjectName': 'Proyecto Sin Nombre',
-        'CustomerRegion': 'No Especificado',
-        'ProjectStatus_Flag': 'Unknown',
-        'DiasRetraso': 0,
-        'CriticalityLevel': 'Normal',
-        'StatusReason_Category': 'Otro',
-        'IndicadorRetraso': 0,
-        'ImpactoVenta': 0,
-        'DuracionProyecto': 0
-    }
-    
-    for col, default in columnas_criticas.items():
-        if col not in df.columns:
-            df[col] = default
-        else:
-            if col in ['DiasRetraso', 'IndicadorRetraso', 'ImpactoVenta', 'DuracionProyecto']:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
-            elif col == 'ProjectID':
-                df[col] = df[col].fillna(-1)
-            else:
-                df[col] = df[col].fillna(default)
-    
-    if 'FechaActualizacion' not in df.columns:
-        df['FechaActualizacion'] = pd.Timestamp.now()
-    else:
-        df['FechaActualizacion'] = pd.to_datetime(df['FechaActualizacion'], errors='coerce')
-    
-    if 'Año' not in df.columns:
-        df['Año'] = df['FechaActualizacion'].dt.year
-    else:
-        df['Año'] = pd.to_numeric(df['Año'], errors='coerce').fillna(2024).astype(int)
-    
-    if 'Mes' not in df.columns:
-        df['Mes'] = df['FechaActualizacion'].dt.strftime('%Y-%m')
-    
-    if 'Trimestre' not in df.columns:
-        df['Trimestre'] = 'T' + df['FechaActualizacion'].dt.quarter.astype(str)
-    else:
-        # Ensure Trimestre is string for concatenation
-        df['Trimestre'] = df['Trimestre'].astype(str)
-    
-    def clasificar_severidad(dias):
-        if dias > 31:
-            return 'Critico >31d'
-        elif dias > 0:
-            return 'Moderado 1-31d'
-        else:
-            return 'Sin retraso'
-    
-    df['SeveridadRetraso'] = df['DiasRetraso'].apply(clasificar_severidad)
-    
-    def clasificar_impacto(monto):
-        if monto > 500000:
-            return '>$500K'
-        elif monto > 100000:
-            return '$100K-$500K'
-        elif monto > 0:
-            return '$1-$100K'
-        else:
-            return 'Sin impacto'
-    
-    df['RangoImpacto'] = df['ImpactoVenta'].apply(clasificar_impacto)
-    
-    df['Año_Trimestre'] = df['Año'].astype(str) + '-' + df['Trimestre']
-    
-    df = df.dropna(subset=['ProjectID'])
-    
-    return df
-
-
-def _aplicar_filtros_avanzados(df: pd.DataFrame) -> pd.DataFrame:
-    """Filtros avanzados en sidebar con métricas de impacto."""
-    
-    st.sidebar.header("Filtros Avanzados")
-    
-    años = sorted(df['Año'].unique())
-    años_sel = st.sidebar.multiselect("Año", años, default=años)
-    df_temp = df[df['Año'].isin(años_sel)] if años_sel else df
-    
-    regiones = sorted(df_temp['CustomerRegion'].unique())
-    regiones_sel = st.sidebar.multiselect("Región del Cliente", regiones, default=regiones)
-    df_temp = df_temp[df_temp['CustomerRegion'].isin(regiones_sel)] if regiones_sel else df_temp
-    
-    estados = sorted(df_temp['ProjectStatus_Flag'].unique())
-    estados_sel = st.sidebar.multiselect("Estado del Proyecto", estados, default=estados)
-    df_temp = df_temp[df_temp['ProjectStatus_Flag'].isin(estados_sel)] if estados_sel else df_temp
-    
-    severidades = sorted(df_temp['SeveridadRetraso'].unique())
-    severidades_sel = st.sidebar.multiselect("Severidad de Retraso", severidades, default=severidades)
-    df_temp = df_temp[df_temp['SeveridadRetraso'].isin(severidades_sel)] if severidades_sel else df_temp
-    
-    if 'CriticalityLevel' in df_temp.columns:
-        criticidades = sorted(df_temp['CriticalityLevel'].unique())
-        criticidades_sel = st.sidebar.multiselect("Nivel de Criticidad", criticidades, default=criticidades)
-        df_temp = df_temp[df_temp['CriticalityLevel'].isin(criticidades_sel)] if criticidades_sel else df_temp
-
-    # Filtro avanzado: Criterio de Parada
-    if 'StatusReason_Category' in df_temp.columns:
-        criterios = sorted(df_temp['StatusReason_Category'].unique())
-        criterios_sel = st.sidebar.multiselect("Criterio de Parada", criterios, default=criterios)
-        df_temp = df_temp[df_temp['StatusReason_Category'].isin(criterios_sel)] if criterios_sel else df_temp
-    
-    st.sidebar.divider()
-    st.sidebar.caption(f"Registros filtrados: {len(df_temp):,} de {len(df):,}")
-    
-    if len(df_temp) > 0:
-        impacto_filtrado = df_temp['ImpactoVenta'].sum()
-        st.sidebar.caption(f"Impacto total: ${impacto_filtrado/1e6:.2f}M")
-    
-    return df_temp
-
-
-def _render_kpis_ejecutivos(df: pd.DataFrame, session_state: dict):
-    """KPIs ejecutivos con comparativas."""
-    
-    st.subheader("Indicadores Ejecutivos Clave")
-    
-    total = len(df)
-    criticos = len(df[df['CriticalityLevel'] == 'Crítico'])
-    con_retraso = len(df[df['DiasRetraso'] > 0])
-    dias_prom = df[df['DiasRetraso'] > 0]['DiasRetraso'].mean() if con_retraso > 0 else 0
-    duracion_prom = df['DuracionProyecto'].mean() if 'DuracionProyecto' in df.columns else 0
-
-    col1, col2, col3, col4 = st.columns(4)
-
-    with col1:
-        st.metric("Total Paradas", f"{total:,}")
-
-    with col2:
-        pct = (criticos / total * 100) if total > 0 else 0
-        st.metric("Proyectos Críticos", f"{criticos:,}", f"{pct:.1f}%")
-
-    with col3:
-        pct = (con_retraso / total * 100) if total > 0 else 0
-        st.metric("Con Retraso", f"{con_retraso:,}", f"{pct:.1f}%")
-
-    with col4:
-        st.metric("Retraso Promedio", f"{dias_prom:.0f} días")
-
-
-def _render_analisis_distribucion(df: pd.DataFrame):
-    """Análisis de distribución con múltiples perspectivas."""
-    
-    st.subheader("Análisis de Distribución")
-    
-    col1, col2 = st.columns(2)
-
-    with col1:
-        severidad_counts = df['SeveridadRetraso'].value_counts()
-        fig_severidad = px.pie(
-            values=severidad_counts.values,
-            names=severidad_counts.index,
-            title="Distribución por Severidad de Retraso",
-            color_discrete_map={
-                'Sin retraso': '#2ecc71',
-                'Moderado 1-31d': '#f39c12',
-                'Critico >31d': '#e74c3c'
-            },
-            hole=0.4
-        )
-        fig_severidad.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_severidad, use_container_width=True)
-
-    with col2:
-        estado_counts = df['ProjectStatus_Flag'].value_counts().head(10)
-        fig_estado = px.bar(
-            x=estado_counts.values,
-            y=estado_counts.index,
-            orientation='h',
-            title="Top 10 Estados de Proyecto",
-            labels={'x': 'Cantidad', 'y': 'Estado'},
-            color=estado_counts.values,
-            color_continuous_scale='Reds'
-        )
-        fig_estado.update_layout(showlegend=False)
-        st.plotly_chart(fig_estado, use_container_width=True)
-
-    col3, col4 = st.columns(2)
-
-    with col3:
-        if 'StatusReason_Category' in df.columns:
-            motivo_counts = df['StatusReason_Category'].value_counts().head(8)
-            fig_motivo = px.bar(
-                x=motivo_counts.index,
-                y=motivo_counts.values,
-                title="Principales Criterios de Parada",
-                labels={'x': 'Criterio de Parada', 'y': 'Cantidad'},
-                color=motivo_counts.values,
-                color_continuous_scale='Blues'
-            )
-            fig_motivo.update_layout(showlegend=False, xaxis_tickangle=-45)
-            st.plotly_chart(fig_motivo, use_container_width=True)
-
-    with col4:
-        region_counts = df['CustomerRegion'].value_counts().head(10)
-        fig_region = px.bar(
-            x=region_counts.values,
-            y=region_counts.index,
-            orientation='h',
-            title="Top 10 Regiones Afectadas",
-            labels={'x': 'Proyectos', 'y': 'Región'},
-            color=region_counts.values,
-            color_continuous_scale='Greens'
-        )
-        fig_region.update_layout(showlegend=False)
-        st.plotly_chart(fig_region, use_container_width=True)
-
-
-def _render_analisis_temporal(df: pd.DataFrame):
-    """Análisis de evolución temporal con múltiples métricas."""
-    
-    st.subheader("Evolución Temporal")
-    
-    df_temporal = df[df['Mes'].notna()].copy()
-    
-    if df_temporal.empty:
-        st.info("No hay datos temporales disponibles para análisis.")
-        return
-    
-    evolucion_mes = df_temporal.groupby('Mes').agg({
-        'ProjectID': 'count',
-        'DiasRetraso': 'mean'
-    }).reset_index()
-    evolucion_mes.columns = ['Mes', 'Cantidad', 'Retraso_Prom']
-    evolucion_mes = evolucion_mes.sort_values('Mes')
-
-    fig_temporal = make_subplots(
-        rows=1, cols=1,
-        subplot_titles=('Cantidad de Paradas y Retraso Promedio',),
-        specs=[[{"secondary_y": True}]],
-        vertical_spacing=0.15
-    )
-
-    fig_temporal.add_trace(
-        go.Bar(
-            x=evolucion_mes['Mes'],
-            y=evolucion_mes['Cantidad'],
-            name='Cantidad Paradas',
-            marker_color='lightblue'
-        ),
-        row=1, col=1, secondary_y=False
-    )
-
-    fig_temporal.add_trace(
-        go.Scatter(
-            x=evolucion_mes['Mes'],
-            y=evolucion_mes['Retraso_Prom'],
-            name='Retraso Promedio',
-            mode='lines+markers',
-            marker=dict(size=8, color='red'),
-            line=dict(width=3)
-        ),
-        row=1, col=1, secondary_y=True
-    )
-
-    fig_temporal.update_xaxes(title_text="Mes", row=1, col=1)
-    fig_temporal.update_yaxes(title_text="Cantidad Paradas", row=1, col=1, secondary_y=False)
-    fig_temporal.update_yaxes(title_text="Retraso Promedio (días)", row=1, col=1, secondary_y=True)
-
-    fig_temporal.update_layout(height=500, hovermode='x unified', showlegend=True)
-
-    st.plotly_chart(fig_temporal, use_container_width=True)
-    
-    if 'Año_Trimestre' in df.columns:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            trimestre_data = df.groupby('Año_Trimestre').size().reset_index(name='Cantidad')
-            trimestre_data = trimestre_data.sort_values('Año_Trimestre')
-            
-            fig_trim = px.line(
-                trimestre_data,
-                x='Año_Trimestre',
-                y='Cantidad',
-                title='Tendencia Trimestral',
-                markers=True
-            )
-            fig_trim.update_traces(line=dict(width=3), marker=dict(size=10))
-            st.plotly_chart(fig_trim, use_container_width=True)
-        
-        with col2:
-            año_data = df.groupby('Año').size().reset_index(name='Cantidad')
-            
-            fig_año = px.bar(
-                año_data,
-                x='Año',
-                y='Cantidad',
-                title='Paradas por Año',
-                color='Cantidad',
-                color_continuous_scale='Oranges'
-            )
-            st.plotly_chart(fig_año, use_container_width=True)
-
-
-def _render_matriz_impacto(df: pd.DataFrame):
-    """Matriz de impacto y análisis de correlación."""
-    
-    # Eliminado análisis de impacto financiero
-    st.subheader("Análisis por Región")
-    region_agg = df.groupby('CustomerRegion').agg({
-        'ProjectID': 'count',
-        'DiasRetraso': 'mean'
-    }).sort_values('DiasRetraso', ascending=False).head(10).reset_index()
-    fig_region = px.bar(
-        region_agg,
-        x='CustomerRegion',
-        y='DiasRetraso',
-        title='Retraso Promedio por Región (Top 10)',
-        labels={'DiasRetraso': 'Retraso Promedio (días)', 'CustomerRegion': 'Región'},
-        color='DiasRetraso',
-        color_continuous_scale='Reds'
-    )
-    fig_region.update_layout(showlegend=False)
-    st.plotly_chart(fig_region, use_container_width=True)
-
-
-def _render_analisis_comparativo(df: pd.DataFrame):
-    """Análisis comparativo por dimensiones clave."""
-    
-    st.subheader("Análisis Comparativo Multidimensional")
-    
-    tab1, tab2, tab3 = st.tabs(["Por Región", "Por Industria", "Por Solución"])
-    
-    with tab1:
-        region_agg = df.groupby('CustomerRegion').agg({
-            'ProjectID': 'count',
-            'ImpactoVenta': 'sum',
-            'DiasRetraso': 'mean'
-        }).sort_values('ImpactoVenta', ascending=False).head(15).reset_index()
-        region_agg.columns = ['Region', 'Proyectos', 'Impacto_Total', 'Retraso_Prom']
-        
-        fig_region = make_subplots(
-            rows=1, cols=2,
-            subplot_titles=('Proyectos por Región', 'Impacto Financiero por Región'),
-            specs=[[{"type": "bar"}, {"type": "bar"}]]
-        )
-        
-        fig_region.add_trace(
-            go.Bar(x=region_agg['Region'], y=region_agg['Proyectos'], name='Proyectos'),
-            row=1, col=1
-        )
-        
-        fig_region.add_trace(
-            go.Bar(
-                x=region_agg['Region'],
-                y=region_agg['Impacto_Total']/1e6,
-                name='Impacto ($M)',
-                marker_color='coral'
-            ),
-            row=1, col=2
-        )
-        
-        fig_region.update_xaxes(tickangle=-45)
-        fig_region.update_layout(height=500, showlegend=False)
-        st.plotly_chart(fig_region, use_container_width=True)
-    
-    with tab2:
-        if 'IndustryID' in df.columns:
-            industry_agg = df.groupby('IndustryID').agg({
-                'ProjectID': 'count',
-                'DiasRetraso': 'mean'
-            }).sort_values('ProjectID', ascending=False).head(12).reset_index()
-            
-            fig_industry = px.bar(
-                industry_agg,
-                x='IndustryID',
-                y='ProjectID',
-                title='Paradas por Industria',
-                labels={'ProjectID': 'Cantidad', 'IndustryID': 'Industria'},
-                color='DiasRetraso',
-                color_continuous_scale='YlOrRd'
-            )
-            fig_industry.update_xaxes(tickangle=-45)
-            st.plotly_chart(fig_industry, use_container_width=True)
-        else:
-            st.info("Datos de industria no disponibles")
-    
-    with tab3:
-        if 'SolutionID' in df.columns:
-            solution_agg = df.groupby('SolutionID').agg({
-                'ProjectID': 'count',
-                'DiasRetraso': 'mean'
-            }).sort_values('ProjectID', ascending=False).head(12).reset_index()
-            
-            fig_solution = px.bar(
-                solution_agg,
-                x='SolutionID',
-                y='ProjectID',
-                title='Paradas por Solución',
-                labels={'ProjectID': 'Cantidad', 'SolutionID': 'Solución'},
-                color='DiasRetraso',
-                color_continuous_scale='Blues'
-            )
-            fig_solution.update_xaxes(tickangle=-45)
-            st.plotly_chart(fig_solution, use_container_width=True)
-        else:
-            st.info("Datos de solución no disponibles")
-
-
-def _render_tablas_detalle(df: pd.DataFrame):
-    """Tablas pivote y detalle exportable."""
-    
-    st.subheader(f"Análisis Detallado ({len(df):,} registros)")
-    
-    tab1, tab2, tab3 = st.tabs(["Tablas Pivote", "Detalle Completo", "Resumen Ejecutivo"])
-    
-    with tab1:
-        st.markdown("#### Tabla Pivote: Región vs Estado")
-        pivot_region_estado = df.pivot_table(
-            index='CustomerRegion',
-            columns='ProjectStatus_Flag',
-            values='ProjectID',
-            aggfunc='count',
-            fill_value=0,
-            margins=True,
-            margins_name='Total'
-        )
-        st.dataframe(pivot_region_estado, use_container_width=True)
-        
-        if 'CriticalityLevel' in df.columns:
-            st.markdown("#### Tabla Pivote: Criticidad vs Severidad")
-            pivot_crit_sev = df.pivot_table(
-                index='CriticalityLevel',
-                columns='SeveridadRetraso',
-                values='ProjectID',
-                aggfunc='count',
-                fill_value=0,
-                margins=True,
-                margins_name='Total'
-            )
-            st.dataframe(pivot_crit_sev, use_container_width=True)
-    
-    with tab2:
-        cols_exportar = [
-            'ProjectID', 'ProjectName', 'CustomerRegion', 'ProjectStatus_Flag',
-            'CriticalityLevel', 'StatusReason_Category', 'DiasRetraso',
-            'ImpactoVenta', 'DuracionProyecto', 'SeveridadRetraso',
-            'Año', 'Trimestre', 'Mes'
-        ]
-        cols_disponibles = [c for c in cols_exportar if c in df.columns]
-        df_detalle = df[cols_disponibles].copy()
-        
-        if 'DiasRetraso' in df_detalle.columns:
-            df_detalle['DiasRetraso'] = df_detalle['DiasRetraso'].round(0).astype(int)
-        
-        if 'ImpactoVenta' in df_detalle.columns:
-            df_detalle['ImpactoVenta_Formatted'] = df_detalle['ImpactoVenta'].apply(
-                lambda x: f"${x:,.0f}"
-            )
-        
-        st.dataframe(df_detalle, use_container_width=True, height=400)
-        
-        csv = df_detalle.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="Descargar Detalle Completo (CSV)",
-            data=csv,
-            file_name=f"detalle_paradas_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-            mime="text/csv"
-        )
-    
-    with tab3:
-        st.markdown("#### Resumen por Región")
-        resumen_region = df.groupby('CustomerRegion').agg({
-            'ProjectID': 'count',
-            'DiasRetraso': ['mean', 'max'],
-            'ImpactoVenta': 'sum'
-        }).round(2)
-        resumen_region.columns = ['Proyectos', 'Retraso_Prom', 'Retraso_Max', 'Impacto_Total']
-        resumen_region = resumen_region.sort_values('Impacto_Total', ascending=False)
-        st.dataframe(resumen_region, use_container_width=True)
-        
-        st.markdown("#### Top 10 Proyectos por Impacto")
-        top_proyectos = df.nlargest(10, 'ImpactoVenta')[
-            ['ProjectName', 'CustomerRegion', 'DiasRetraso', 'ImpactoVenta']
-        ].copy()
-        top_proyectos['ImpactoVenta'] = top_proyectos['ImpactoVenta'].apply(
-            lambda x: f"${x:,.0f}"
-        )
+"""
+Vista Paradas de Proyecto - Dashboard General Optimizado
+Diseño ejecutivo con visualizaciones estratégicas y análisis multidimensional
+"""
+import io
+
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from datetime import datetime
+
+
+def render_vista_paradas(df: pd.DataFrame, session_state: dict):
+    """
+    Dashboard ejecutivo de paradas con visualizaciones estratégicas.
+    """
+    st.title("Dashboard Ejecutivo - Paradas de Proyecto")
+
+    # Sin copia defensiva aquí: _preparar_datos_robustos es pura (copia una
+    # sola vez internamente y está cacheada), y el diagnóstico solo lee.
+    diagnostico = _diagnosticar_disponibilidad_datos(df)
+    
+    if diagnostico['faltan_criticas']:
+        st.warning(
+            f"Columnas críticas no disponibles: {', '.join(diagnostico['faltan_criticas'])}. "
+            f"El dashboard funcionará con datos parciales."
+        )
+    
+    with st.expander("Diagnóstico de Disponibilidad de Datos"):
+        # El cuerpo de un expander se ejecuta en cada rerun aunque esté
+        # cerrado; las ~40 llamadas a st.text solo se emiten bajo demanda.
+        if st.checkbox("Mostrar detalle de columnas", key='show_diag'):
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown("**Columnas Disponibles**")
+                st.caption(f"Total: {len(diagnostico['disponibles'])}")
+                for col in sorted(diagnostico['disponibles'])[:20]:
+                    st.text(f"  {col}")
+                if len(diagnostico['disponibles']) > 20:
+                    st.caption(f"  ... y {len(diagnostico['disponibles']) - 20} más")
+
+            with col2:
+                st.markdown("**Columnas Faltantes**")
+                st.caption(f"Total: {len(diagnostico['faltan_all'])}")
+                for col in sorted(diagnostico['faltan_all'])[:20]:
+                    st.text(f"  {col}")
+                if len(diagnostico['faltan_all']) > 20:
+                    st.caption(f"  ... y {len(diagnostico['faltan_all']) - 20} más")
+    
+    df = _preparar_datos_robustos(df)
+    
+    if df.empty:
+        st.error("No hay datos disponibles para procesar después de la validación.")
+        return
+    
+    _render_kpis_ejecutivos(df, session_state)
+    
+    st.divider()
+    
+    df_filtrado = _aplicar_filtros_avanzados(df)
+    
+    if df_filtrado.empty:
+        st.info("No hay datos que coincidan con los filtros seleccionados.")
+        return
+
+    # Un solo groupby por dimensión: factorizar la clave domina el costo de
+    # cada groupby, así que todas las métricas por región/industria/solución
+    # se agregan en una pasada y los renderers consumen cortes del resultado.
+    by_region = _agg_por_clave(df_filtrado, 'CustomerRegion', incluir_impacto=True)
+    by_industry = None
+    if 'IndustryID' in df_filtrado.columns:
+        by_industry = _agg_por_clave(df_filtrado, 'IndustryID')
+    by_solution = None
+    if 'SolutionID' in df_filtrado.columns:
+        by_solution = _agg_por_clave(df_filtrado, 'SolutionID')
+
+    st.sidebar.caption(f"Impacto total: ${by_region['Impacto_Total'].sum()/1e6:.2f}M")
+
+    st.divider()
+
+    # Conteos calculados una sola vez sobre el frame filtrado y compartidos
+    # con los renderers, en vez de un value_counts por gráfico. Las columnas
+    # categóricas reportan conteo 0 para valores eliminados por los filtros;
+    # se descartan antes de graficar.
+    aggs = {}
+    for clave, col, top in [('severidad', 'SeveridadRetraso', None),
+                            ('estado', 'ProjectStatus_Flag', 10),
+                            ('motivo', 'StatusReason_Category', 8),
+                            ('region', 'CustomerRegion', 10)]:
+        if col in df_filtrado.columns:
+            counts = df_filtrado[col].value_counts()
+            counts = counts[counts > 0]
+            aggs[clave] = counts.head(top) if top else counts
+
+    _render_analisis_distribucion(aggs)
+
+    st.divider()
+
+    _render_analisis_temporal(df_filtrado)
+
+    st.divider()
+
+    _render_matriz_impacto(by_region)
+
+    st.divider()
+
+    _render_analisis_comparativo(by_region, by_industry, by_solution)
+
+    st.divider()
+
+    _render_tablas_detalle(df_filtrado, by_region)
+
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=4)
+def _diagnosticar_disponibilidad_datos(df: pd.DataFrame) -> dict:
+    """Diagnostica disponibilidad de columnas esperadas."""
+    
+    columnas_esperadas = {
+        'criticas': [
+            'ProjectID', 'ProjectName', 'CustomerRegion', 
+            'ProjectStatus_Flag', 'DiasRetraso'
+        ],
+        'temporales': ['Año', 'Trimestre', 'Mes', 'FechaActualizacion'],
+        'detalle': [
+            'CriticalityLevel', 'StatusReason_Category', 'IndicadorRetraso', 
+            'ImpactoVenta', 'DuracionProyecto', 'SolutionID', 'IndustryID'
+        ]
+    }
+    
+    disponibles = df.columns.tolist()
+    faltan_criticas = [c for c in columnas_esperadas['criticas'] if c not in disponibles]
+    faltan_all = []
+    for grupo in columnas_esperadas.values():
+        faltan_all.extend([c for c in grupo if c not in disponibles])
+    
+    return {
+        'disponibles': disponibles,
+        'faltan_criticas': faltan_criticas,
+        'faltan_all': list(set(faltan_all)),
+        'columnas_esperadas': columnas_esperadas
+    }
+
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=4)
+def _preparar_datos_robustos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepara datos con validación inteligente y transformaciones.
+    Cacheada: es una función pura del frame de entrada, así cada click de
+    filtro reutiliza la preparación (coerciones numéricas/fechas y
+    clasificadores) en vez de repetirla en cada rerun.
+    """
+    
+    df = df.copy()
+    
+    # Dedup de columnas en una sola pasada (duplicated() recorría el índice
+    # dos veces); con el cache esto corre una vez por entrada distinta.
+    vistas = set()
+    keep = [c not in vistas and not vistas.add(c) for c in df.columns.tolist()]
+    if not all(keep):
+        df = df.iloc[:, [i for i, k in enumerate(keep) if k]]
+    
+    columnas_criticas = {
+        'ProjectID': range(1, len(df) + 1),
+        'ProjectName': 'Proyecto Sin Nombre',
+        'CustomerRegion': 'No Especificado',
+        'ProjectStatus_Flag': 'Unknown',
+        'DiasRetraso': 0,
+        'CriticalityLevel': 'Normal',
+        'StatusReason_Category': 'Otro',
+        'IndicadorRetraso': 0,
+        'ImpactoVenta': 0,
+        'DuracionProyecto': 0
+    }
+    
+    for col, default in columnas_criticas.items():
+        if col not in df.columns:
+            df[col] = default
+        else:
+            if col in ['DiasRetraso', 'IndicadorRetraso', 'ImpactoVenta', 'DuracionProyecto']:
+                # Si la columna ya viene numérica del loader, basta el fillna;
+                # la coerción completa solo corre sobre datos sucios.
+                if pd.api.types.is_numeric_dtype(df[col]):
+                    df[col] = df[col].fillna(0)
+                else:
+                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+            elif col == 'ProjectID':
+                df[col] = df[col].fillna(-1)
+            else:
+                serie = df[col]
+                # Columnas category con NaN (joins sin correspondencia en
+                # sidecars viejos): agregar la etiqueta por defecto antes
+                # del fillna, que con categoría nueva lanza TypeError.
+                if isinstance(serie.dtype, pd.CategoricalDtype) and default not in serie.cat.categories:
+                    serie = serie.cat.add_categories([default])
+                df[col] = serie.fillna(default)
+    
+    if 'FechaActualizacion' not in df.columns:
+        df['FechaActualizacion'] = pd.Timestamp.now()
+    else:
+        df['FechaActualizacion'] = pd.to_datetime(df['FechaActualizacion'], errors='coerce')
+    
+    if 'Año' not in df.columns:
+        df['Año'] = df['FechaActualizacion'].dt.year
+    else:
+        df['Año'] = pd.to_numeric(df['Año'], errors='coerce').fillna(2024).astype(int)
+    
+    if 'Mes' not in df.columns:
+        df['Mes'] = df['FechaActualizacion'].dt.strftime('%Y-%m')
+    
+    if 'Trimestre' not in df.columns:
+        df['Trimestre'] = 'T' + df['FechaActualizacion'].dt.quarter.astype(str)
+    else:
+        # Ensure Trimestre is string for concatenation
+        df['Trimestre'] = df['Trimestre'].astype(str)
+
+    # Período mensual pre-calculado: agrupar/ordenar por PeriodIndex compara
+    # enteros en vez de strings 'YYYY-MM' y ya sale ordenado por construcción.
+    # Si Mes no viene como 'YYYY-MM' queda NaT y la vista usa Mes tal cual.
+    df['MesPeriod'] = pd.to_datetime(
+        df['Mes'].astype(str), format='%Y-%m', errors='coerce'
+    ).dt.to_period('M')
+    
+    # Clasificadores vectorizados: np.select evalúa las condiciones sobre el
+    # ndarray completo en vez de llamar una función Python por fila.
+    dias = df['DiasRetraso'].to_numpy()
+    df['SeveridadRetraso'] = np.select(
+        [dias > 31, dias > 0],
+        ['Critico >31d', 'Moderado 1-31d'],
+        default='Sin retraso'
+    )
+
+    monto = df['ImpactoVenta'].to_numpy()
+    df['RangoImpacto'] = np.select(
+        [monto > 500000, monto > 100000, monto > 0],
+        ['>$500K', '$100K-$500K', '$1-$100K'],
+        default='Sin impacto'
+    )
+    
+    # str.cat concatena en una sola pasada, sin la Serie temporal intermedia
+    # que generan los dos '+' elemento a elemento.
+    df['Año_Trimestre'] = df['Año'].astype(str).str.cat(df['Trimestre'], sep='-')
+
+    df = df.dropna(subset=['ProjectID'])
+
+    # Codificación categórica de las columnas de baja cardinalidad: los
+    # value_counts/groupby/isin posteriores comparan códigos enteros en vez
+    # de hashear strings, y la memoria por columna cae a un arreglo de códigos.
+    cat_cols = ['CustomerRegion', 'ProjectStatus_Flag', 'CriticalityLevel',
+                'StatusReason_Category', 'SeveridadRetraso', 'RangoImpacto',
+                'Trimestre', 'Año_Trimestre']
+    for c in cat_cols:
+        if c in df.columns:
+            df[c] = df[c].astype('category')
+
+    return df
+
+
+def _aplicar_filtros_avanzados(df: pd.DataFrame) -> pd.DataFrame:
+    """Filtros avanzados en sidebar con métricas de impacto."""
+    
+    st.sidebar.header("Filtros Avanzados")
+
+    # Una sola máscara acumulada y un único slice final: los 6 filtros
+    # encadenados materializaban un DataFrame intermedio (copia) cada uno.
+    # Las opciones de cada selector se siguen derivando del estado ya
+    # filtrado por los selectores anteriores, vía la máscara parcial.
+    mask = np.ones(len(df), dtype=bool)
+
+    años = sorted(df.loc[mask, 'Año'].unique())
+    años_sel = st.sidebar.multiselect("Año", años, default=años)
+    if años_sel:
+        mask &= df['Año'].isin(años_sel).to_numpy()
+
+    regiones = sorted(df.loc[mask, 'CustomerRegion'].unique())
+    regiones_sel = st.sidebar.multiselect("Región del Cliente", regiones, default=regiones)
+    if regiones_sel:
+        mask &= df['CustomerRegion'].isin(regiones_sel).to_numpy()
+
+    estados = sorted(df.loc[mask, 'ProjectStatus_Flag'].unique())
+    estados_sel = st.sidebar.multiselect("Estado del Proyecto", estados, default=estados)
+    if estados_sel:
+        mask &= df['ProjectStatus_Flag'].isin(estados_sel).to_numpy()
+
+    severidades = sorted(df.loc[mask, 'SeveridadRetraso'].unique())
+    severidades_sel = st.sidebar.multiselect("Severidad de Retraso", severidades, default=severidades)
+    if severidades_sel:
+        mask &= df['SeveridadRetraso'].isin(severidades_sel).to_numpy()
+
+    if 'CriticalityLevel' in df.columns:
+        criticidades = sorted(df.loc[mask, 'CriticalityLevel'].unique())
+        criticidades_sel = st.sidebar.multiselect("Nivel de Criticidad", criticidades, default=criticidades)
+        if criticidades_sel:
+            mask &= df['CriticalityLevel'].isin(criticidades_sel).to_numpy()
+
+    # Filtro avanzado: Criterio de Parada
+    if 'StatusReason_Category' in df.columns:
+        criterios = sorted(df.loc[mask, 'StatusReason_Category'].unique())
+        criterios_sel = st.sidebar.multiselect("Criterio de Parada", criterios, default=criterios)
+        if criterios_sel:
+            mask &= df['StatusReason_Category'].isin(criterios_sel).to_numpy()
+
+    df_temp = df.loc[mask]
+    
+    st.sidebar.divider()
+    st.sidebar.caption(f"Registros filtrados: {len(df_temp):,} de {len(df):,}")
+
+    # El caption de impacto total se emite en render_vista_paradas reusando
+    # la agregación por región, sin otra pasada completa sobre ImpactoVenta.
+    return df_temp
+
+
+def _render_kpis_ejecutivos(df: pd.DataFrame, session_state: dict):
+    """KPIs ejecutivos con comparativas."""
+    
+    st.subheader("Indicadores Ejecutivos Clave")
+    
+    total = len(df)
+    criticos = len(df[df['CriticalityLevel'] == 'Crítico'])
+    con_retraso = len(df[df['DiasRetraso'] > 0])
+    dias_prom = df[df['DiasRetraso'] > 0]['DiasRetraso'].mean() if con_retraso > 0 else 0
+    duracion_prom = df['DuracionProyecto'].mean() if 'DuracionProyecto' in df.columns else 0
+
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.metric("Total Paradas", f"{total:,}")
+
+    with col2:
+        pct = (criticos / total * 100) if total > 0 else 0
+        st.metric("Proyectos Críticos", f"{criticos:,}", f"{pct:.1f}%")
+
+    with col3:
+        pct = (con_retraso / total * 100) if total > 0 else 0
+        st.metric("Con Retraso", f"{con_retraso:,}", f"{pct:.1f}%")
+
+    with col4:
+        st.metric("Retraso Promedio", f"{dias_prom:.0f} días")
+
+
+def _render_analisis_distribucion(aggs: dict):
+    """Análisis de distribución con múltiples perspectivas."""
+
+    st.subheader("Análisis de Distribución")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        severidad_counts = aggs['severidad']
+        fig_severidad = px.pie(
+            values=severidad_counts.values,
+            names=severidad_counts.index,
+            title="Distribución por Severidad de Retraso",
+            color_discrete_map={
+                'Sin retraso': '#2ecc71',
+                'Moderado 1-31d': '#f39c12',
+                'Critico >31d': '#e74c3c'
+            },
+            hole=0.4
+        )
+        fig_severidad.update_traces(textposition='inside', textinfo='percent+label')
+        st.plotly_chart(fig_severidad, use_container_width=True)
+
+    with col2:
+        estado_counts = aggs['estado']
+        fig_estado = px.bar(
+            x=estado_counts.values,
+            y=estado_counts.index,
+            orientation='h',
+            title="Top 10 Estados de Proyecto",
+            labels={'x': 'Cantidad', 'y': 'Estado'},
+            color=estado_counts.values,
+            color_continuous_scale='Reds'
+        )
+        fig_estado.update_layout(showlegend=False)
+        st.plotly_chart(fig_estado, use_container_width=True)
+
+    col3, col4 = st.columns(2)
+
+    with col3:
+        if 'motivo' in aggs:
+            motivo_counts = aggs['motivo']
+            fig_motivo = px.bar(
+                x=motivo_counts.index,
+                y=motivo_counts.values,
+                title="Principales Criterios de Parada",
+                labels={'x': 'Criterio de Parada', 'y': 'Cantidad'},
+                color=motivo_counts.values,
+                color_continuous_scale='Blues'
+            )
+            fig_motivo.update_layout(showlegend=False, xaxis_tickangle=-45)
+            st.plotly_chart(fig_motivo, use_container_width=True)
+
+    with col4:
+        region_counts = aggs['region']
+        fig_region = px.bar(
+            x=region_counts.values,
+            y=region_counts.index,
+            orientation='h',
+            title="Top 10 Regiones Afectadas",
+            labels={'x': 'Proyectos', 'y': 'Región'},
+            color=region_counts.values,
+            color_continuous_scale='Greens'
+        )
+        fig_region.update_layout(showlegend=False)
+        st.plotly_chart(fig_region, use_container_width=True)
+
+
+def _agg_por_clave(df: pd.DataFrame, clave: str, incluir_impacto: bool = False) -> pd.DataFrame:
+    """
+    Agregación por grupo sin tabla hash: sobre los códigos enteros de la clave
+    (cat.codes o factorize), count/sum se resuelven con np.bincount y el
+    máximo con np.maximum.at - reducciones a nivel C, cache-friendly, en vez
+    del groupby hasheado de pandas. Devuelve solo los grupos observados.
+    """
+    s = df[clave]
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes = s.cat.codes.to_numpy()
+        grupos = s.cat.categories
+    else:
+        codes, grupos = pd.factorize(s)
+    valid = codes >= 0
+    codes = codes[valid]
+    n = len(grupos)
+
+    dias = df['DiasRetraso'].to_numpy(dtype='float64')[valid]
+    conteo = np.bincount(codes, minlength=n)
+    suma_dias = np.bincount(codes, weights=dias, minlength=n)
+
+    res = pd.DataFrame(
+        {'Proyectos': conteo, '_SumaDias': suma_dias},
+        index=pd.Index(grupos, name=clave)
+    )
+    if incluir_impacto:
+        impacto = df['ImpactoVenta'].to_numpy(dtype='float64')[valid]
+        res['Impacto_Total'] = np.bincount(codes, weights=impacto, minlength=n)
+        maximos = np.full(n, -np.inf)
+        np.maximum.at(maximos, codes, dias)
+        res['Retraso_Max'] = maximos
+
+    res = res[res['Proyectos'] > 0]
+    res['Retraso_Prom'] = res['_SumaDias'] / res['Proyectos']
+    return res.drop(columns='_SumaDias')
+
+
+def _limitar_puntos(df: pd.DataFrame, max_puntos: int = 2000) -> pd.DataFrame:
+    """
+    Limita las filas que se serializan hacia Plotly tomando índices
+    equiespaciados (siempre incluye el primero y el último punto). Para
+    historias largas, el payload JSON y el render del navegador dominan la
+    latencia total, no el cómputo en pandas.
+    """
+    if len(df) <= max_puntos:
+        return df
+    idx = np.linspace(0, len(df) - 1, max_puntos).round().astype(int)
+    return df.iloc[np.unique(idx)]
+
+
+def _render_analisis_temporal(df: pd.DataFrame):
+    """Análisis de evolución temporal con múltiples métricas."""
+
+    st.subheader("Evolución Temporal")
+    
+    if 'MesPeriod' in df.columns and df['MesPeriod'].notna().any():
+        df_temporal = df[df['MesPeriod'].notna()]
+        evolucion_mes = df_temporal.groupby('MesPeriod', observed=True).agg(
+            Cantidad=('ProjectID', 'count'),
+            Retraso_Prom=('DiasRetraso', 'mean')
+        ).sort_index().reset_index()
+        # Plotly recibe strings solo para el eje x, ya ordenado.
+        evolucion_mes['Mes'] = evolucion_mes['MesPeriod'].astype(str)
+    else:
+        df_temporal = df[df['Mes'].notna()]
+
+        if df_temporal.empty:
+            st.info("No hay datos temporales disponibles para análisis.")
+            return
+
+        evolucion_mes = df_temporal.groupby('Mes', observed=True).agg({
+            'ProjectID': 'count',
+            'DiasRetraso': 'mean'
+        }).reset_index()
+        evolucion_mes.columns = ['Mes', 'Cantidad', 'Retraso_Prom']
+        evolucion_mes = evolucion_mes.sort_values('Mes')
+
+    evolucion_mes = _limitar_puntos(evolucion_mes)
+
+    fig_temporal = make_subplots(
+        rows=1, cols=1,
+        subplot_titles=('Cantidad de Paradas y Retraso Promedio',),
+        specs=[[{"secondary_y": True}]],
+        vertical_spacing=0.15
+    )
+
+    fig_temporal.add_trace(
+        go.Bar(
+            x=evolucion_mes['Mes'],
+            y=evolucion_mes['Cantidad'],
+            name='Cantidad Paradas',
+            marker_color='lightblue'
+        ),
+        row=1, col=1, secondary_y=False
+    )
+
+    fig_temporal.add_trace(
+        go.Scatter(
+            x=evolucion_mes['Mes'],
+            y=evolucion_mes['Retraso_Prom'],
+            name='Retraso Promedio',
+            mode='lines+markers',
+            marker=dict(size=8, color='red'),
+            line=dict(width=3)
+        ),
+        row=1, col=1, secondary_y=True
+    )
+
+    fig_temporal.update_xaxes(title_text="Mes", row=1, col=1)
+    fig_temporal.update_yaxes(title_text="Cantidad Paradas", row=1, col=1, secondary_y=False)
+    fig_temporal.update_yaxes(title_text="Retraso Promedio (días)", row=1, col=1, secondary_y=True)
+
+    fig_temporal.update_layout(height=500, hovermode='x unified', showlegend=True)
+
+    st.plotly_chart(fig_temporal, use_container_width=True)
+    
+    if 'Año_Trimestre' in df.columns:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            trimestre_data = df.groupby('Año_Trimestre', observed=True).size().reset_index(name='Cantidad')
+            trimestre_data = trimestre_data.sort_values('Año_Trimestre')
+            trimestre_data = _limitar_puntos(trimestre_data)
+            
+            fig_trim = px.line(
+                trimestre_data,
+                x='Año_Trimestre',
+                y='Cantidad',
+                title='Tendencia Trimestral',
+                markers=True
+            )
+            fig_trim.update_traces(line=dict(width=3), marker=dict(size=10))
+            st.plotly_chart(fig_trim, use_container_width=True)
+        
+        with col2:
+            año_data = df.groupby('Año', observed=True).size().reset_index(name='Cantidad')
+            
+            fig_año = px.bar(
+                año_data,
+                x='Año',
+                y='Cantidad',
+                title='Paradas por Año',
+                color='Cantidad',
+                color_continuous_scale='Oranges'
+            )
+            st.plotly_chart(fig_año, use_container_width=True)
+
+
+def _render_matriz_impacto(by_region: pd.DataFrame):
+    """Matriz de impacto y análisis de correlación."""
+
+    # Eliminado análisis de impacto financiero
+    st.subheader("Análisis por Región")
+    region_agg = by_region.sort_values(
+        'Retraso_Prom', ascending=False
+    ).head(10).reset_index()
+    fig_region = px.bar(
+        region_agg,
+        x='CustomerRegion',
+        y='Retraso_Prom',
+        title='Retraso Promedio por Región (Top 10)',
+        labels={'Retraso_Prom': 'Retraso Promedio (días)', 'CustomerRegion': 'Región'},
+        color='Retraso_Prom',
+        color_continuous_scale='Reds'
+    )
+    fig_region.update_layout(showlegend=False)
+    st.plotly_chart(fig_region, use_container_width=True)
+
+
+def _render_analisis_comparativo(by_region: pd.DataFrame, by_industry, by_solution):
+    """Análisis comparativo por dimensiones clave."""
+
+    st.subheader("Análisis Comparativo Multidimensional")
+
+    tab1, tab2, tab3 = st.tabs(["Por Región", "Por Industria", "Por Solución"])
+
+    with tab1:
+        region_agg = by_region.sort_values(
+            'Impacto_Total', ascending=False
+        ).head(15).reset_index().rename(columns={'CustomerRegion': 'Region'})
+        
+        fig_region = make_subplots(
+            rows=1, cols=2,
+            subplot_titles=('Proyectos por Región', 'Impacto Financiero por Región'),
+            specs=[[{"type": "bar"}, {"type": "bar"}]]
+        )
+        
+        fig_region.add_trace(
+            go.Bar(x=region_agg['Region'], y=region_agg['Proyectos'], name='Proyectos'),
+            row=1, col=1
+        )
+        
+        fig_region.add_trace(
+            go.Bar(
+                x=region_agg['Region'],
+                y=region_agg['Impacto_Total']/1e6,
+                name='Impacto ($M)',
+                marker_color='coral'
+            ),
+            row=1, col=2
+        )
+        
+        fig_region.update_xaxes(tickangle=-45)
+        fig_region.update_layout(height=500, showlegend=False)
+        st.plotly_chart(fig_region, use_container_width=True)
+    
+    with tab2:
+        if by_industry is not None:
+            industry_agg = by_industry.sort_values(
+                'Proyectos', ascending=False
+            ).head(12).reset_index()
+
+            fig_industry = px.bar(
+                industry_agg,
+                x='IndustryID',
+                y='Proyectos',
+                title='Paradas por Industria',
+                labels={'Proyectos': 'Cantidad', 'IndustryID': 'Industria'},
+                color='Retraso_Prom',
+                color_continuous_scale='YlOrRd'
+            )
+            fig_industry.update_xaxes(tickangle=-45)
+            st.plotly_chart(fig_industry, use_container_width=True)
+        else:
+            st.info("Datos de industria no disponibles")
+
+    with tab3:
+        if by_solution is not None:
+            solution_agg = by_solution.sort_values(
+                'Proyectos', ascending=False
+            ).head(12).reset_index()
+
+            fig_solution = px.bar(
+                solution_agg,
+                x='SolutionID',
+                y='Proyectos',
+                title='Paradas por Solución',
+                labels={'Proyectos': 'Cantidad', 'SolutionID': 'Solución'},
+                color='Retraso_Prom',
+                color_continuous_scale='Blues'
+            )
+            fig_solution.update_xaxes(tickangle=-45)
+            st.plotly_chart(fig_solution, use_container_width=True)
+        else:
+            st.info("Datos de solución no disponibles")
+
+
+@st.cache_data(show_spinner=False)
+def _csv_bytes(df: pd.DataFrame) -> bytes:
+    """Serializa a CSV una sola vez por frame; los reruns reusan los bytes."""
+    return df.to_csv(index=False).encode('utf-8')
+
+
+@st.cache_data(show_spinner=False)
+def _parquet_bytes(df: pd.DataFrame) -> bytes:
+    """Serializa a Parquet (zstd): más rápido y varias veces más chico que CSV."""
+    buf = io.BytesIO()
+    df.to_parquet(buf, engine='pyarrow', compression='zstd')
+    return buf.getvalue()
+
+
+def _render_tablas_detalle(df: pd.DataFrame, by_region: pd.DataFrame):
+    """Tablas pivote y detalle exportable."""
+    
+    st.subheader(f"Análisis Detallado ({len(df):,} registros)")
+    
+    tab1, tab2, tab3 = st.tabs(["Tablas Pivote", "Detalle Completo", "Resumen Ejecutivo"])
+    
+    with tab1:
+        # pd.crosstab resuelve el conteo 2D sobre los códigos categóricos,
+        # bastante más rápido que pivot_table(aggfunc='count') con márgenes.
+        # Las filas/columnas en cero (valores eliminados por los filtros) se
+        # descartan conservando los totales.
+        st.markdown("#### Tabla Pivote: Región vs Estado")
+        pivot_region_estado = pd.crosstab(
+            df['CustomerRegion'], df['ProjectStatus_Flag'],
+            margins=True, margins_name='Total'
+        )
+        pivot_region_estado = pivot_region_estado.loc[
+            pivot_region_estado['Total'] > 0,
+            pivot_region_estado.loc['Total'] > 0
+        ]
+        st.dataframe(pivot_region_estado, use_container_width=True)
+
+        if 'CriticalityLevel' in df.columns:
+            st.markdown("#### Tabla Pivote: Criticidad vs Severidad")
+            pivot_crit_sev = pd.crosstab(
+                df['CriticalityLevel'], df['SeveridadRetraso'],
+                margins=True, margins_name='Total'
+            )
+            pivot_crit_sev = pivot_crit_sev.loc[
+                pivot_crit_sev['Total'] > 0,
+                pivot_crit_sev.loc['Total'] > 0
+            ]
+            st.dataframe(pivot_crit_sev, use_container_width=True)
+    
+    with tab2:
+        cols_exportar = [
+            'ProjectID', 'ProjectName', 'CustomerRegion', 'ProjectStatus_Flag',
+            'CriticalityLevel', 'StatusReason_Category', 'DiasRetraso',
+            'ImpactoVenta', 'DuracionProyecto', 'SeveridadRetraso',
+            'Año', 'Trimestre', 'Mes'
+        ]
+        cols_disponibles = [c for c in cols_exportar if c in df.columns]
+        df_detalle = df[cols_disponibles].copy()
+        
+        if 'DiasRetraso' in df_detalle.columns:
+            df_detalle['DiasRetraso'] = df_detalle['DiasRetraso'].round(0).astype(int)
+        
+        if 'ImpactoVenta' in df_detalle.columns:
+            # '$' + map sobre enteros evita el lambda f-string por fila.
+            montos = df_detalle['ImpactoVenta'].round().astype('int64')
+            df_detalle['ImpactoVenta_Formatted'] = '$' + montos.map('{:,}'.format)
+        
+        st.dataframe(df_detalle, use_container_width=True, height=400)
+        
+        # Timestamp fijado en session_state: un now() por minuto cambiaría la
+        # identidad del widget y forzaría reconstruirlo en cada rerun. Solo se
+        # renueva cuando cambia el contenido filtrado (firma filas/columnas).
+        firma = (len(df_detalle), tuple(df_detalle.columns))
+        if st.session_state.get('export_firma') != firma:
+            st.session_state['export_firma'] = firma
+            st.session_state['export_ts'] = datetime.now().strftime('%Y%m%d_%H%M')
+        export_ts = st.session_state['export_ts']
+
+        col_csv, col_parquet = st.columns(2)
+        with col_csv:
+            st.download_button(
+                label="Descargar Detalle Completo (CSV)",
+                data=_csv_bytes(df_detalle),
+                file_name=f"detalle_paradas_{export_ts}.csv",
+                mime="text/csv"
+            )
+        with col_parquet:
+            st.download_button(
+                label="Descargar Detalle Completo (Parquet)",
+                data=_parquet_bytes(df_detalle),
+                file_name=f"detalle_paradas_{export_ts}.parquet",
+                mime="application/octet-stream"
+            )
+    
+    with tab3:
+        st.markdown("#### Resumen por Región")
+        resumen_region = by_region[
+            ['Proyectos', 'Retraso_Prom', 'Retraso_Max', 'Impacto_Total']
+        ].round(2).sort_values('Impacto_Total', ascending=False)
+        st.dataframe(resumen_region, use_container_width=True)
+        
+        st.markdown("#### Top 10 Proyectos por Impacto")
+        # np.argpartition selecciona los k mayores en O(N) (sin ordenar todo
+        # el frame); solo los 10 elegidos se ordenan para la tabla.
+        impacto = df['ImpactoVenta'].to_numpy()
+        k = min(10, len(impacto))
+        idx = np.argpartition(impacto, -k)[-k:] if len(impacto) > k else np.arange(len(impacto))
+        idx = idx[np.argsort(-impacto[idx])]
+        top_proyectos = df.iloc[idx][
+            ['ProjectName', 'CustomerRegion', 'DiasRetraso', 'ImpactoVenta']
+        ].copy()
+        top_montos = top_proyectos['ImpactoVenta'].round().astype('int64')
+        top_proyectos['ImpactoVenta'] = '$' + top_montos.map('{:,}'.format)
         st.dataframe(top_proyectos, use_container_width=True, hide_index=True)
\ No newline at end of file
@@ -1,365 +1,523 @@
-"""
-Vista de Retrasos - Dashboard Optimizado para Día a Día
-Enfoque: Registros activos, gestión móvil y acciones inmediatas
-"""
-import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
-from datetime import datetime, timedelta
-
-
-def render_vista_retrasos(df_filtrado: pd.DataFrame, session_state: dict):
-    """
-    Renderiza dashboard de retrasos optimizado para seguimiento día a día.
-    
-    Args:
-        df_filtrado (pd.DataFrame): DataFrame filtrado de proyectos.
-        session_state (dict): Estado global de Streamlit.
-    """
-    st.title("Gestión de Retrasos - Seguimiento Operacional")
-    
-    df = df_filtrado.copy()
-    df = _preparar_columnas(df)
-    df_retrasos = df[df['DiasRetraso'] > 0].copy()
-    
-    if df_retrasos.empty:
-        st.warning("No se encontraron proyectos con retrasos.")
-        return
-    
-    # KPIs ejecutivos en una fila
-    _render_kpis_compactos(df, df_retrasos)
-    
-    st.markdown("---")
-    
-    # Filtros operacionales
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        filtro_socio = st.selectbox(
-            "Socio Implementador",
-            options=['Todos'] + sorted(df_retrasos['MainPartner'].unique()),
-            key='filtro_socio'
-        )
-    
-    with col2:
-        filtro_region = st.selectbox(
-            "Región Cliente",
-            options=['Todos'] + sorted(df_retrasos['CustomerRegion'].unique()),
-            key='filtro_region'
-        )
-    
-    with col3:
-        filtro_gravedad = st.selectbox(
-            "Nivel de Gravedad",
-            options=['Todos', 'Crítico (>31d)', 'Moderado (8-31d)', 'Leve (1-7d)'],
-            key='filtro_gravedad'
-        )
-    
-    with col4:
-        busqueda = st.text_input("Buscar proyecto", placeholder="Nombre o ID")
-    
-    # Aplicar filtros
-    df_filtrado_vis = _aplicar_filtros_operacionales(
-        df_retrasos, filtro_socio, filtro_region, filtro_gravedad, busqueda
-    )
-    
-    if df_filtrado_vis.empty:
-        st.info("No hay registros que coincidan con los filtros aplicados.")
-        return
-    
-    # Tabla principal de proyectos activos
-    _render_tabla_retrasos_activos(df_filtrado_vis)
-    
-    st.markdown("---")
-    
-    # Resumen comparativo
-    _render_comparativa_dimensiones(df_retrasos)
-    
-    st.markdown("---")
-    
-    # Listado de acciones recomendadas
-    _render_acciones_recomendadas(df_retrasos)
-
-
-def _preparar_columnas(df: pd.DataFrame) -> pd.DataFrame:
-    """Prepara y valida columnas necesarias."""
-    
-    cols_defaults = {
-        'MainPartner': 'No Especificado',
-        'CustomerRegion': 'No Especificado',
-        'SolutionArea': 'No Especificado',
-        'ISS': 'No Especificado',
-        'ProjectStatus': 'Unknown',
-        'ProjectName': 'Proyecto',
-        'ProjectID': '0'
-    }
-    
-    for col, default in cols_defaults.items():
-        if col not in df.columns:
-            df[col] = default
-        df[col] = df[col].fillna(default)
-    
-    # Recalcular DiasRetraso usando la fecha seleccionada
-    from datetime import datetime
-    fecha_hoy = st.session_state.get('fecha_hoy', None)
-    if fecha_hoy is not None:
-        # Si existe columna de fecha de referencia, usarla
-        if 'PlannedGoLive' in df.columns:
-            df['PlannedGoLive'] = pd.to_datetime(df['PlannedGoLive'], errors='coerce')
-            fecha_hoy_dt = pd.to_datetime(fecha_hoy)
-            df['DiasRetraso'] = (fecha_hoy_dt - df['PlannedGoLive']).dt.days
-            df['DiasRetraso'] = df['DiasRetraso'].fillna(0).astype(int)
-        else:
-            if 'DiasRetraso' not in df.columns:
-                df['DiasRetraso'] = 0
-            df['DiasRetraso'] = pd.to_numeric(df['DiasRetraso'], errors='coerce').fillna(0)
-    else:
-        if 'DiasRetraso' not in df.columns:
-            df['DiasRetraso'] = 0
-        df['DiasRetraso'] = pd.to_numeric(df['DiasRetraso'], errors='coerce').fillna(0)
-    return df
-
-
-def _render_kpis_compactos(df: pd.DataFrame, df_retrasos: pd.DataFrame):
-    """Renderiza KPIs en formato compacto."""
-    
-    st.subheader("Indicadores Operacionales")
-    
-    total_proyectos = len(df)
-    retrasados = len(df_retrasos)
-    tasa = (retrasados / total_proyectos * 100) if total_proyectos > 0 else 0
-    dias_prom = df_retrasos['DiasRetraso'].mean()
-    criticos = len(df_retrasos[df_retrasos['DiasRetraso'] > 31])
-    
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        st.metric("Proyectos Retrasados", f"{retrasados}/{total_proyectos}", f"{tasa:.1f}%")
-    
-    with col2:
-        st.metric("Promedio de Retraso", f"{dias_prom:.0f} días")
-    
-    with col3:
-        st.metric("Críticos (>31d)", f"{criticos}")
-    
-    with col4:
-        top_region = df_retrasos.groupby('CustomerRegion')['DiasRetraso'].sum().idxmax()
-        st.metric("Mayor Impacto", top_region[:15])
-
-
-def _aplicar_filtros_operacionales(
-    df: pd.DataFrame, socio: str, region: str, gravedad: str, busqueda: str
-) -> pd.DataFrame:
-    """Aplica filtros operacionales al dataframe."""
-    
-    if socio != 'Todos':
-        df = df[df['MainPartner'] == socio]
-    
-    if region != 'Todos':
-        df = df[df['CustomerRegion'] == region]
-    
-    if gravedad != 'Todos':
-        if gravedad == 'Crítico (>31d)':
-            df = df[df['DiasRetraso'] > 31]
-        elif gravedad == 'Moderado (8-31d)':
-            df = df[(df['DiasRetraso'] > 7) & (df['DiasRetraso'] <= 31)]
-        elif gravedad == 'Leve (1-7d)':
-            df = df[df['DiasRetraso'] <= 7]
-    
-    if busqueda:
-        df = df[df['ProjectName'].str.contains(busqueda, case=False, na=False)]
-    
-    return df.sort_values('DiasRetraso', ascending=False)
-
-
-def _render_tabla_retrasos_activos(df: pd.DataFrame):
-    """Renderiza tabla principal de retrasos."""
-    
-    st.subheader(f"Proyectos Activos con Retraso ({len(df)} registros)")
-    
-    # Preparar datos
-    df_vista = df[[
-        'ProjectName', 'MainPartner', 'CustomerRegion', 
-        'DiasRetraso', 'ProjectStatus', 'SolutionArea'
-    ]].copy()
-    
-    df_vista['DiasRetraso'] = df_vista['DiasRetraso'].astype(int)
-    df_vista = df_vista.reset_index(drop=True)
-    # Ensure columns are unique to avoid Styler.apply KeyError
-    df_vista = df_vista.loc[:, ~df_vista.columns.duplicated()]
-    
-    # Función de coloreado
-    def colorear_fila(row):
-        dias = row['DiasRetraso']
-        if dias > 31:
-            return ['background-color: #ffe6e6'] * len(row)
-        elif dias > 7:
-            return ['background-color: #fff4e6'] * len(row)
-        return [''] * len(row)
-    
-    # Mostrar tabla
-    st.dataframe(
-        df_vista.style.apply(colorear_fila, axis=1),
-        hide_index=True,
-        use_container_width=True,
-        height=400
-    )
-    
-    # Botón de descarga
-    csv = df_vista.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="Descargar Reporte CSV",
-        data=csv,
-        file_name=f"retrasos_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-        mime="text/csv"
-    )
-
-
-def _render_comparativa_dimensiones(df: pd.DataFrame):
-    """Renderiza comparativa simple de impacto por dimensión."""
-    
-    st.subheader("Concentración de Impacto por Dimensión")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("**Por Socio Implementador**")
-        socio_impact = df.groupby('MainPartner').agg({
-            'ProjectID': 'count',
-            'DiasRetraso': 'sum'
-        }).sort_values('DiasRetraso', ascending=False).head(8)
-        socio_impact.columns = ['Cantidad', 'Días Acum.']
-        st.dataframe(socio_impact, use_container_width=True)
-    
-    with col2:
-        st.markdown("**Por Región del Cliente**")
-        region_impact = df.groupby('CustomerRegion').agg({
-            'ProjectID': 'count',
-            'DiasRetraso': 'sum'
-        }).sort_values('DiasRetraso', ascending=False).head(8)
-        region_impact.columns = ['Cantidad', 'Días Acum.']
-        st.dataframe(region_impact, use_container_width=True)
-
-
-def _render_acciones_recomendadas(df: pd.DataFrame):
-    """Renderiza lista de acciones prioritarias."""
-    
-    st.subheader("Acciones Prioritarias del Día")
-    
-    # Top críticos
-    criticos = df[df['DiasRetraso'] > 31].nlargest(5, 'DiasRetraso')
-    
-    if not criticos.empty:
-        st.markdown("**Intervención Inmediata (>31 días de retraso)**")
-        for idx, row in criticos.iterrows():
-            col1, col2, col3 = st.columns([2, 2, 1])
-            with col1:
-                st.text(f"{row['ProjectName']}")
-            with col2:
-                st.text(f"{row['MainPartner']} - {row['CustomerRegion']}")
-            with col3:
-                st.metric("", f"{int(row['DiasRetraso'])}d")
-    
-    # Casos moderados próximos a crítico
-    moderados = df[
-        (df['DiasRetraso'] > 15) & (df['DiasRetraso'] <= 31)
-    ].nlargest(5, 'DiasRetraso')
-    
-    if not moderados.empty:
-        st.markdown("**Monitoreo de Proximidad (15-31 días)**")
-        for idx, row in moderados.iterrows():
-            col1, col2, col3 = st.columns([2, 2, 1])
-            with col1:
-                st.text(f"{row['ProjectName']}")
-            with col2:
-                st.text(f"{row['MainPartner']} - {row['CustomerRegion']}")
-            with col3:
-                st.metric("", f"{int(row['DiasRetraso'])}d")
-
-
-def render_tabla_detalle(df_filtrado: pd.DataFrame, session_state: dict):
-    """
-    Renderiza tabla detallada con búsqueda y exportación.
-    Compatible con otras vistas de Streamlit.
-    
-    Args:
-        df_filtrado (pd.DataFrame): DataFrame filtrado.
-        session_state (dict): Estado global.
-    """
-    st.subheader("Detalle Completo de Retrasos")
-    
-    df = df_filtrado.copy()
-    df = _preparar_columnas(df)
-    df = df[df['DiasRetraso'] > 0].copy()
-    
-    if df.empty:
-        st.info("No hay proyectos con retraso para mostrar.")
-        return
-    
-    # Búsqueda y filtros
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        busqueda = st.text_input("Buscar por nombre:", placeholder="Ingresa texto")
-        if busqueda:
-            df = df[df['ProjectName'].str.contains(busqueda, case=False, na=False)]
-    
-    with col2:
-        min_dias = st.number_input("Retraso mínimo (días):", min_value=0, value=0)
-        df = df[df['DiasRetraso'] >= min_dias]
-    
-    df = df.sort_values('DiasRetraso', ascending=False)
-    
-    # Tabla
-    cols_mostrar = ['ProjectName', 'MainPartner', 'CustomerRegion', 
-                    'SolutionArea', 'DiasRetraso', 'ProjectStatus']
-    
-    for col in cols_mostrar:
-        if col not in df.columns:
-            df[col] = 'N/A'
-    
-    df_display = df[cols_mostrar].reset_index(drop=True)
-    df_display['DiasRetraso'] = df_display['DiasRetraso'].astype(int)
-    # Ensure columns are unique to avoid Styler.apply KeyError
-    df_display = df_display.loc[:, ~df_display.columns.duplicated()]
-    
-    # Paginación
-    total_rows = len(df_display)
-    rows_per_page = 100
-    total_pages = max(1, (total_rows - 1) // rows_per_page + 1)
-    
-    page = st.number_input(
-        f"Página (Total: {total_rows} registros)",
-        min_value=1,
-        max_value=total_pages,
-        value=1
-    )
-    
-    start_idx = (page - 1) * rows_per_page
-    end_idx = start_idx + rows_per_page
-    df_page = df_display.iloc[start_idx:end_idx]
-    
-    # Coloreo
-    def highlight_severity(row):
-        dias = row['DiasRetraso']
-        if dias > 31:
-            return ['background-color: #ffe6e6'] * len(row)
-        elif dias > 7:
-            return ['background-color: #fff4e6'] * len(row)
-        return [''] * len(row)
-    
-    st.dataframe(
-        df_page.style.apply(highlight_severity, axis=1),
-        hide_index=True,
-        use_container_width=True,
-        height=600
-    )
-    
-    # Exportar
-    csv_data = df_display.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="Descargar Reporte Completo",
-        data=csv_data,
-        file_name=f"retrasos_detalle_{datetime.now().strftime('%Y%m%d')}.csv",
-        mime="text/csv"
+"""
+Vista de Retrasos - Dashboard Optimizado para Día a Día
+Enfoque: Registros activos, gestión móvil y acciones inmediatas
+"""
+import io
+
+import streamlit as st
+import plotly.graph_objects as go
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+
+def render_vista_retrasos(df_filtrado: pd.DataFrame, session_state: dict):
+    """
+    Renderiza dashboard de retrasos optimizado para seguimiento día a día.
+    
+    Args:
+        df_filtrado (pd.DataFrame): DataFrame filtrado de proyectos.
+        session_state (dict): Estado global de Streamlit.
+    """
+    st.title("Gestión de Retrasos - Seguimiento Operacional")
+    
+    df = _preparar_columnas(df_filtrado, st.session_state.get('fecha_hoy', None))
+    # Orden descendente una sola vez: los filtros y las acciones
+    # recomendadas trabajan sobre slices que preservan este orden, así
+    # que ni el filtro re-ordena ni las acciones pagan nlargest.
+    # Máscara numpy + .loc: sin Series booleana intermedia ni copia
+    # defensiva; con copy-on-write la vista es segura río abajo.
+    mask_retraso = df['DiasRetraso'].to_numpy() > 0
+    df_retrasos = df.loc[mask_retraso].sort_values('DiasRetraso', ascending=False)
+
+    if df_retrasos.empty:
+        st.warning("No se encontraron proyectos con retrasos.")
+        return
+    
+    # Agregados por socio/región calculados una vez y compartidos entre
+    # los KPIs y la comparativa; el KPI de mayor impacto ya no corre su
+    # propio groupby solo para elegir una etiqueta.
+    socio_impact, region_impact = _comparativa_impacto(df_retrasos)
+
+    # KPIs ejecutivos en una fila
+    _render_kpis_compactos(df, df_retrasos, region_impact)
+    
+    st.markdown("---")
+
+    # Filtros + tabla como fragmento: cambiar un filtro re-ejecuta solo
+    # este bloque, no los KPIs ni la comparativa de abajo.
+    _fragmento_filtros_tabla(df_retrasos)
+
+    st.markdown("---")
+    
+    # Resumen comparativo
+    _render_comparativa_dimensiones(socio_impact, region_impact)
+    
+    st.markdown("---")
+    
+    # Listado de acciones recomendadas
+    _render_acciones_recomendadas(df_retrasos)
+
+
+@st.cache_data(show_spinner=False)
+def _preparar_columnas(df: pd.DataFrame, fecha_hoy) -> pd.DataFrame:
+    """Prepara y valida columnas necesarias.
+
+    Cacheada: el parseo de fechas y los fillna corrían en cada rerun
+    (cada tecla del buscador). La fecha de referencia entra como
+    argumento para formar parte de la clave del cache; los llamadores
+    ya no necesitan copy() porque cache_data devuelve una copia.
+    """
+
+    df = df.copy()
+
+    cols_defaults = {
+        'MainPartner': 'No Especificado',
+        'CustomerRegion': 'No Especificado',
+        'SolutionArea': 'No Especificado',
+        'ISS': 'No Especificado',
+        'ProjectStatus': 'Unknown',
+        'ProjectName': 'Proyecto',
+        'ProjectID': '0'
+    }
+
+    # Defaults en una sola pasada: el fillna por columna despachaba una
+    # llamada pandas (y una Series nueva) por cada entrada del dict.
+    faltantes = {c: d for c, d in cols_defaults.items() if c not in df.columns}
+    if faltantes:
+        df = df.assign(**faltantes)
+    # El loader entrega las dimensiones como category; si un sidecar viejo
+    # trae NaN de joins sin correspondencia, la etiqueta por defecto tiene
+    # que existir como categoría antes del fillna (si no, TypeError).
+    for col, default in cols_defaults.items():
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype) and default not in serie.cat.categories:
+            df[col] = serie.cat.add_categories([default])
+    df.fillna(cols_defaults, inplace=True)
+
+    # Dimensiones de baja cardinalidad como category: los groupby,
+    # unique y filtros de igualdad operan sobre códigos enteros en vez
+    # de rehashear strings por fila, y la memoria baja en proporción.
+    for col in ('MainPartner', 'CustomerRegion', 'SolutionArea', 'ISS', 'ProjectStatus'):
+        df[col] = df[col].astype('category')
+
+    # Recalcular DiasRetraso usando la fecha seleccionada
+    if fecha_hoy is not None:
+        # Si existe columna de fecha de referencia, usarla
+        if 'PlannedGoLive' in df.columns:
+            df['PlannedGoLive'] = pd.to_datetime(df['PlannedGoLive'], errors='coerce', cache=True)
+            # Resta directa en datetime64[D]: evita materializar la Serie
+            # timedelta64 intermedia y el .dt.days/fillna sobre ella.
+            dt64 = df['PlannedGoLive'].to_numpy(dtype='datetime64[D]')
+            hoy64 = np.datetime64(pd.to_datetime(fecha_hoy).to_pydatetime().date(), 'D')
+            dias = (hoy64 - dt64).astype('int64')
+            df['DiasRetraso'] = np.where(np.isnat(dt64), 0, dias)
+        else:
+            if 'DiasRetraso' not in df.columns:
+                df['DiasRetraso'] = 0
+            df['DiasRetraso'] = pd.to_numeric(df['DiasRetraso'], errors='coerce').fillna(0)
+    else:
+        if 'DiasRetraso' not in df.columns:
+            df['DiasRetraso'] = 0
+        df['DiasRetraso'] = pd.to_numeric(df['DiasRetraso'], errors='coerce').fillna(0)
+
+    # Bucket de gravedad precalculado una sola vez (category/int8): el
+    # filtro pasa a ser una comparación de códigos en vez de reconstruir
+    # dos máscaras booleanas sobre DiasRetraso en cada rerun.
+    df['_grav'] = pd.cut(
+        df['DiasRetraso'],
+        bins=[-np.inf, 0, 7, 31, np.inf],
+        labels=['ok', 'leve', 'mod', 'crit']
+    )
+
+    # Nombre en minúsculas precalculado para el buscador: lowercase una
+    # sola vez aquí en lugar de case=False (regex por fila) por tecla.
+    # Columna real y no df.attrs para que sobreviva slicing y cache.
+    df['_name_lower'] = df['ProjectName'].astype(str).str.lower()
+
+    # ProjectName es de alta cardinalidad (no conviene category); en
+    # string[pyarrow] las comparaciones y el contains del buscador usan
+    # kernels C de Arrow y la columna pesa una fracción del object dtype.
+    # pyarrow ya es dependencia efectiva (cache Parquet del ETL), pero
+    # se degrada a object sin romper si faltara.
+    try:
+        df['ProjectName'] = df['ProjectName'].astype('string[pyarrow]')
+        df['_name_lower'] = df['_name_lower'].astype('string[pyarrow]')
+    except (ImportError, TypeError):
+        pass
+    return df
+
+
+def _render_kpis_compactos(df: pd.DataFrame, df_retrasos: pd.DataFrame, region_impact: pd.DataFrame):
+    """Renderiza KPIs en formato compacto."""
+    
+    st.subheader("Indicadores Operacionales")
+    
+    total_proyectos = len(df)
+    retrasados = len(df_retrasos)
+    tasa = (retrasados / total_proyectos * 100) if total_proyectos > 0 else 0
+    dias_prom = df_retrasos['DiasRetraso'].mean()
+    criticos = len(df_retrasos[df_retrasos['DiasRetraso'] > 31])
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("Proyectos Retrasados", f"{retrasados}/{total_proyectos}", f"{tasa:.1f}%")
+    
+    with col2:
+        st.metric("Promedio de Retraso", f"{dias_prom:.0f} días")
+    
+    with col3:
+        st.metric("Críticos (>31d)", f"{criticos}")
+    
+    with col4:
+        top_region = str(region_impact['Días Acum.'].idxmax())
+        st.metric("Mayor Impacto", top_region[:15])
+
+
+@st.fragment
+def _fragmento_filtros_tabla(df_retrasos: pd.DataFrame):
+    """Filtros operacionales y tabla principal, aislados en un fragmento.
+
+    Una interacción con estos widgets re-ejecuta solo este bloque; el
+    resto de la vista (KPIs, comparativa, acciones) no se vuelve a
+    renderizar.
+    """
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        filtro_socio = st.selectbox(
+            "Socio Implementador",
+            options=_opciones_filtro(df_retrasos, 'MainPartner'),
+            key='filtro_socio'
+        )
+
+    with col2:
+        filtro_region = st.selectbox(
+            "Región Cliente",
+            options=_opciones_filtro(df_retrasos, 'CustomerRegion'),
+            key='filtro_region'
+        )
+
+    with col3:
+        filtro_gravedad = st.selectbox(
+            "Nivel de Gravedad",
+            options=['Todos', 'Crítico (>31d)', 'Moderado (8-31d)', 'Leve (1-7d)'],
+            key='filtro_gravedad'
+        )
+
+    with col4:
+        # El form desacopla el tecleo del rerun: sin él, cada tecla
+        # re-ejecutaba todo el pipeline de la vista. El filtro se
+        # aplica solo al enviar (botón o Enter).
+        with st.form("form_busqueda", border=False):
+            busqueda = st.text_input("Buscar proyecto", placeholder="Nombre o ID")
+            st.form_submit_button("Buscar")
+
+    # Aplicar filtros
+    df_filtrado_vis = _aplicar_filtros_operacionales(
+        df_retrasos, filtro_socio, filtro_region, filtro_gravedad, busqueda
+    )
+
+    if df_filtrado_vis.empty:
+        st.info("No hay registros que coincidan con los filtros aplicados.")
+        return
+
+    # Tabla principal de proyectos activos
+    _render_tabla_retrasos_activos(df_filtrado_vis)
+
+
+@st.cache_data(show_spinner=False)
+def _opciones_filtro(df: pd.DataFrame, col: str) -> list:
+    """Opciones de selectbox memoizadas: el unique+sort corría en cada
+    rerun aunque solo hubiera cambiado el texto del buscador. Para
+    columnas category se leen las categorías observadas (ya ordenadas)
+    sin pasada de hash."""
+    valores = df[col]
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        presentes = valores.cat.remove_unused_categories().cat.categories
+        return ['Todos'] + presentes.tolist()
+    return ['Todos'] + sorted(valores.unique())
+
+
+# Mapa opción de UI -> etiqueta del bucket _grav calculado en la preparación.
+_GRAVEDAD_NIVEL = {
+    'Crítico (>31d)': 'crit',
+    'Moderado (8-31d)': 'mod',
+    'Leve (1-7d)': 'leve',
+}
+
+
+def _aplicar_filtros_operacionales(
+    df: pd.DataFrame, socio: str, region: str, gravedad: str, busqueda: str
+) -> pd.DataFrame:
+    """Aplica filtros operacionales al dataframe."""
+    
+    if socio != 'Todos':
+        df = df[df['MainPartner'] == socio]
+    
+    if region != 'Todos':
+        df = df[df['CustomerRegion'] == region]
+    
+    nivel = _GRAVEDAD_NIVEL.get(gravedad)
+    if nivel is not None:
+        df = df[df['_grav'].eq(nivel)]
+    
+    if busqueda:
+        df = df[df['_name_lower'].str.contains(busqueda.lower(), regex=False, na=False)]
+
+    # El frame llega ordenado por DiasRetraso desc y las máscaras
+    # booleanas preservan el orden; no hace falta re-ordenar.
+    return df
+
+
+@st.cache_data(show_spinner=False)
+def _to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """Serializa el frame a CSV una vez por contenido distinto.
+
+    Sin cache, cada rerun (cada tecla del buscador) pagaba el to_csv
+    completo aunque el estado de filtros no hubiera cambiado. En el
+    camino frío se usa el writer CSV de Arrow, que escribe por bloques
+    de columnas en C; el to_csv de pandas queda como degradación.
+    """
+    try:
+        import pyarrow as pa
+        from pyarrow import csv as pa_csv
+
+        sink = io.BytesIO()
+        pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), sink)
+        return sink.getvalue()
+    except Exception:
+        return df.to_csv(index=False).encode('utf-8')
+
+
+def _estilos_severidad(df: pd.DataFrame) -> pd.DataFrame:
+    """Estilos de fondo por severidad en una sola pasada vectorizada.
+
+    Reemplaza el callback por fila de Styler (una llamada Python por
+    registro): el color se decide con np.where sobre DiasRetraso y se
+    difunde a todas las columnas de una vez.
+    """
+    dias = df['DiasRetraso'].to_numpy()
+    fila = np.where(dias > 31, 'background-color: #ffe6e6',
+                    np.where(dias > 7, 'background-color: #fff4e6', ''))
+    return pd.DataFrame(
+        np.repeat(fila[:, None], df.shape[1], axis=1),
+        index=df.index, columns=df.columns
+    )
+
+
+def _render_tabla_retrasos_activos(df: pd.DataFrame):
+    """Renderiza tabla principal de retrasos."""
+    
+    st.subheader(f"Proyectos Activos con Retraso ({len(df)} registros)")
+    
+    # Preparar datos
+    df_vista = df[[
+        'ProjectName', 'MainPartner', 'CustomerRegion', 
+        'DiasRetraso', 'ProjectStatus', 'SolutionArea'
+    ]].copy()
+    
+    df_vista['DiasRetraso'] = df_vista['DiasRetraso'].astype(int)
+    df_vista = df_vista.reset_index(drop=True)
+    df_vista = df_vista.loc[:, ~df_vista.columns.duplicated()]
+
+    # El CSV se encodea antes de insertar la columna de severidad para
+    # que el export conserve exactamente las columnas de siempre.
+    csv = _to_csv_bytes(df_vista)
+
+    # Sin Styler en la tabla principal: el puente Styler->frontend
+    # serializa CSS por celda y domina el render en frames medianos.
+    # La severidad se marca con un ícono y el formato numérico se
+    # delega a column_config.
+    dias = df_vista['DiasRetraso'].to_numpy()
+    df_vista.insert(0, 'Sev', np.where(dias > 31, '🔴', np.where(dias > 7, '🟠', '🟢')))
+
+    st.dataframe(
+        df_vista,
+        column_config={
+            'Sev': st.column_config.TextColumn('Sev', width='small'),
+            'DiasRetraso': st.column_config.NumberColumn('Días', format='%d'),
+        },
+        hide_index=True,
+        use_container_width=True,
+        height=400
+    )
+
+    # Botón de descarga. El timestamp se fija por sesión: un now() por
+    # rerun cambiaría la identidad del artefacto y el frontend
+    # reconstruiría el blob aunque los datos no cambiaran.
+    if 'retrasos_export_ts' not in st.session_state:
+        st.session_state['retrasos_export_ts'] = datetime.now().strftime('%Y%m%d_%H%M%S')
+    st.download_button(
+        label="Descargar Reporte CSV",
+        data=csv,
+        file_name=f"retrasos_{st.session_state['retrasos_export_ts']}.csv",
+        mime="text/csv"
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _comparativa_impacto(df: pd.DataFrame) -> tuple:
+    """Agrega cantidad y días acumulados por socio y por región.
+
+    Una sola función cacheada en vez de dos pipelines groupby por
+    rerun: en un cache hit no se vuelve a hashear ninguna clave.
+    """
+    resultados = []
+    dias = df['DiasRetraso'].to_numpy(dtype='float64')
+    for col in ('MainPartner', 'CustomerRegion'):
+        serie = df[col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            # np.bincount sobre los códigos: dos reducciones C sin tabla
+            # hash, posible porque la clave ya es category (cardinalidad
+            # baja). Los grupos no observados se descartan como haría
+            # observed=True.
+            codes = serie.cat.codes.to_numpy()
+            validos = codes >= 0
+            codes = codes[validos]
+            n = len(serie.cat.categories)
+            cantidad = np.bincount(codes, minlength=n)
+            acumulado = np.bincount(codes, weights=dias[validos], minlength=n)
+            agg = pd.DataFrame(
+                {'Cantidad': cantidad, 'Días Acum.': acumulado.astype(np.int64)},
+                index=serie.cat.categories
+            )
+            agg = agg[agg['Cantidad'] > 0]
+            agg = agg.sort_values('Días Acum.', ascending=False)
+        else:
+            agg = df.groupby(col, observed=True).agg({
+                'ProjectID': 'count',
+                'DiasRetraso': 'sum'
+            }).sort_values('DiasRetraso', ascending=False)
+            agg.columns = ['Cantidad', 'Días Acum.']
+        resultados.append(agg)
+    return tuple(resultados)
+
+
+def _render_comparativa_dimensiones(socio_impact: pd.DataFrame, region_impact: pd.DataFrame):
+    """Renderiza comparativa simple de impacto por dimensión."""
+
+    st.subheader("Concentración de Impacto por Dimensión")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown("**Por Socio Implementador**")
+        st.dataframe(socio_impact.head(8), use_container_width=True)
+
+    with col2:
+        st.markdown("**Por Región del Cliente**")
+        st.dataframe(region_impact.head(8), use_container_width=True)
+
+
+def _render_acciones_recomendadas(df: pd.DataFrame):
+    """Renderiza lista de acciones prioritarias."""
+    
+    st.subheader("Acciones Prioritarias del Día")
+    
+    # Top críticos y moderados: el frame ya viene ordenado desc, así
+    # que head(5) equivale a nlargest sin el partial sort extra.
+    criticos = df[df['DiasRetraso'] > 31].head(5)
+    moderados = df[
+        (df['DiasRetraso'] > 15) & (df['DiasRetraso'] <= 31)
+    ].head(5)
+
+    if criticos.empty and moderados.empty:
+        st.info("No hay casos críticos ni en proximidad.")
+        return
+
+    # Una sola tabla en lugar del bucle st.columns/st.text/st.metric
+    # por registro: cada widget era un mensaje independiente al frontend,
+    # ~30 por rerun para 10 filas.
+    top = pd.concat([criticos, moderados])
+    top = top.assign(
+        Prioridad=(['Intervención Inmediata (>31d)'] * len(criticos)
+                   + ['Monitoreo de Proximidad (15-31d)'] * len(moderados))
+    )[['Prioridad', 'ProjectName', 'MainPartner', 'CustomerRegion', 'DiasRetraso']]
+    top['DiasRetraso'] = top['DiasRetraso'].astype(int)
+
+    st.dataframe(top, hide_index=True, use_container_width=True)
+
+
+def render_tabla_detalle(df_filtrado: pd.DataFrame, session_state: dict):
+    """
+    Renderiza tabla detallada con búsqueda y exportación.
+    Compatible con otras vistas de Streamlit.
+    
+    Args:
+        df_filtrado (pd.DataFrame): DataFrame filtrado.
+        session_state (dict): Estado global.
+    """
+    st.subheader("Detalle Completo de Retrasos")
+    
+    df = _preparar_columnas(df_filtrado, st.session_state.get('fecha_hoy', None))
+    df = df.loc[df['DiasRetraso'].to_numpy() > 0]
+    
+    if df.empty:
+        st.info("No hay proyectos con retraso para mostrar.")
+        return
+    
+    # Búsqueda y filtros
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        busqueda = st.text_input("Buscar por nombre:", placeholder="Ingresa texto")
+        if busqueda:
+            df = df[df['_name_lower'].str.contains(busqueda.lower(), regex=False, na=False)]
+    
+    with col2:
+        min_dias = st.number_input("Retraso mínimo (días):", min_value=0, value=0)
+        df = df[df['DiasRetraso'] >= min_dias]
+    
+    df = df.sort_values('DiasRetraso', ascending=False)
+    
+    # Tabla
+    cols_mostrar = ['ProjectName', 'MainPartner', 'CustomerRegion', 
+                    'SolutionArea', 'DiasRetraso', 'ProjectStatus']
+    
+    for col in cols_mostrar:
+        if col not in df.columns:
+            df[col] = 'N/A'
+    
+    # Paginación antes de seleccionar/convertir: solo la página visible
+    # paga el copy y el astype, no las N filas del frame completo.
+    total_rows = len(df)
+    rows_per_page = 100
+    total_pages = max(1, (total_rows - 1) // rows_per_page + 1)
+
+    page = st.number_input(
+        f"Página (Total: {total_rows} registros)",
+        min_value=1,
+        max_value=total_pages,
+        value=1
+    )
+
+    start_idx = (page - 1) * rows_per_page
+    end_idx = start_idx + rows_per_page
+    df_page = df.iloc[start_idx:end_idx][cols_mostrar].reset_index(drop=True)
+    df_page['DiasRetraso'] = df_page['DiasRetraso'].astype(int)
+    # Ensure columns are unique to avoid Styler.apply KeyError
+    df_page = df_page.loc[:, ~df_page.columns.duplicated()]
+    
+    st.dataframe(
+        df_page.style.apply(_estilos_severidad, axis=None),
+        hide_index=True,
+        use_container_width=True,
+        height=600
+    )
+    
+    # Exportar: el frame completo solo se arma para el CSV, cuyo
+    # encode ya está cacheado por contenido.
+    df_export = df[cols_mostrar]
+    df_export = df_export.loc[:, ~df_export.columns.duplicated()].copy()
+    df_export['DiasRetraso'] = df_export['DiasRetraso'].astype(int)
+    csv_data = _to_csv_bytes(df_export)
+    if 'detalle_export_fecha' not in st.session_state:
+        st.session_state['detalle_export_fecha'] = datetime.now().strftime('%Y%m%d')
+    st.download_button(
+        label="Descargar Reporte Completo",
+        data=csv_data,
+        file_name=f"retrasos_detalle_{st.session_state['detalle_export_fecha']}.csv",
+        mime="text/csv"
     )
\ No newline at end of file